@@ -1,34 +1,71 @@
 import chess
-import concurrent.futures
-import numpy as np
-import concurrent.futures
 from evaluate_board import ChessEvaluator
+import bitbases
 import time
 import random
 from threading import Lock
 
-# Am Anfang der Datei nach den Imports
-_global_evaluator = ChessEvaluator()
+# NumPy, concurrent.futures und die Aktionsraum-Tabellen werden erst bei Bedarf
+# importiert, damit kurzlebige Engine-Aufrufe (cli.py) schnell starten.
+
+# Gemeinsamer Evaluator, wird beim ersten Aufruf von get_evaluator angelegt
+_global_evaluator = None
+_global_evaluator_lock = Lock()
+
+
+def get_evaluator() -> ChessEvaluator:
+    """Gibt den gemeinsamen Evaluator zurück und legt ihn beim ersten Aufruf an."""
+    global _global_evaluator
+    if _global_evaluator is None:
+        with _global_evaluator_lock:
+            if _global_evaluator is None:
+                _global_evaluator = ChessEvaluator()
+    return _global_evaluator
+
+# Ein gemeinsamer Thread-Pool pro Prozess für alle ChessEnv-Instanzen.
+# Worker-Prozesse (engine_service, batch_analysis) setzen ihn per set_search_threads auf 1,
+# sonst liefen Prozesse x SEARCH_THREADS Threads auf denselben Kernen.
+SEARCH_THREADS = 8
+_search_executor = None
+_search_executor_lock = Lock()
+
+
+def set_search_threads(threads: int):
+    """Legt die Größe des gemeinsamen Such-Pools fest; ein bestehender Pool wird ersetzt."""
+    global SEARCH_THREADS, _search_executor
+    if threads < 1:
+        raise ValueError("threads muss mindestens 1 sein")
+    with _search_executor_lock:
+        SEARCH_THREADS = threads
+        if _search_executor is not None:
+            _search_executor.shutdown(wait=False)
+            _search_executor = None
+
+
+def get_search_executor() -> 'concurrent.futures.ThreadPoolExecutor':
+    """Gibt den gemeinsamen Such-Pool zurück und legt ihn beim ersten Aufruf an."""
+    import concurrent.futures
+
+    global _search_executor
+    with _search_executor_lock:
+        if _search_executor is None:
+            _search_executor = concurrent.futures.ThreadPoolExecutor(max_workers=SEARCH_THREADS)
+        return _search_executor
+
+# Obergrenze für Iterative Deepening (z.B. wenn Bitbasen jeden Ast sofort beenden)
+MAX_SEARCH_DEPTH = 64
 
 PIECE_VALUES = {'P': 1, 'N': 3, 'B': 3, 'R': 5, 'Q': 9, 'K': 0}
 
 class ChessEnv:
     def __init__(self, player_color, depth, search_time):
         self.search_time = search_time
-        self.transposition_table = {}
         self.board = chess.Board()
         self.player_color = player_color
         self.ai_color = not player_color
-        self.tt_lock = Lock()
-        self.evaluator = ChessEvaluator()  # Erstelle eine einzelne Instanz
-        # Erstelle einen neuen Executor für die Instanz
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=8)
-
-    def __del__(self):
-        if hasattr(self, 'executor'):
-            self.executor.shutdown(wait=False)
-
-    global_executor = None
+        self.evaluator = get_evaluator()  # Gemeinsame Instanz
+        self.last_search_info = {}  # Score, Tiefe und Knoten der letzten Suche
+        self.action_mask = None  # Wiederverwendeter Puffer, siehe legal_action_mask
 
     def reset(self):
         """Setzt das Spiel zurück und gibt den Startzustand zurück."""
@@ -37,15 +74,38 @@ class ChessEnv:
 
     def get_state(self):
         """Gibt den aktuellen Zustand des Bretts als Array zurück."""
+        import numpy as np
+
         state = np.zeros(64)
         for square, piece in self.board.piece_map().items():
             state[square] = piece.piece_type if piece.color == chess.WHITE else -piece.piece_type
         return state
 
+    def legal_action_mask(self):
+        """Gibt die legalen Aktionen als bool-Array der Länge ACTION_SPACE_SIZE zurück.
+
+        Der Puffer wird bei jedem Aufruf überschrieben; wer ihn aufheben will, muss kopieren.
+        """
+        from action_space import ACTION_SPACE_SIZE, MOVE_TO_ACTION
+
+        if self.action_mask is None:
+            import numpy as np
+            self.action_mask = np.zeros(ACTION_SPACE_SIZE, dtype=bool)
+        self.action_mask.fill(False)
+        self.action_mask[[MOVE_TO_ACTION[move] for move in self.board.legal_moves]] = True
+        return self.action_mask
+
     def step(self, move):
-        """Führt einen Zug aus und gibt neuen Zustand, Belohnung und Spielende zurück."""
-        move_obj = chess.Move.from_uci(move)
-        if move_obj in self.board.legal_moves:
+        """Führt einen Zug aus und gibt neuen Zustand, Belohnung und Spielende zurück.
+
+        move ist ein Aktionsindex (siehe action_space.py) oder ein UCI-String.
+        """
+        if isinstance(move, str):
+            move_obj = chess.Move.from_uci(move)
+        else:
+            from action_space import decode_action
+            move_obj = decode_action(int(move), self.board)
+        if move_obj is not None and self.board.is_legal(move_obj):
             self.board.push(move_obj)
             reward = self.get_reward()
             done = self.board.is_game_over()
@@ -75,54 +135,73 @@ class ChessEnv:
         return board_matrix
 
     def get_ai_move(self):
+        import concurrent.futures
+
         start_time = time.time()
         best_move = None
         best_score = -float('inf')
+        best_depth = 0
         depth = 1
+        node_stats = []
+        self.last_search_info = {}
         
         legal_moves = list(self.board.legal_moves)
         if not legal_moves:
             return None
 
+        executor = get_search_executor()
         try:
-            while time.time() - start_time < self.search_time * 0.8:  # 80% der verfügbaren Zeit
-                with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(legal_moves))) as executor:
-                    current_best_move = None
-                    current_best_score = -float('inf')
-                    
-                    futures = {
-                        executor.submit(
-                            self.evaluate_move_with_depth,
-                            move,
-                            depth,
-                            start_time
-                        ): move for move in legal_moves
-                    }
-                    
-                    for future in concurrent.futures.as_completed(futures):
-                        try:
-                            move = futures[future]
-                            score = future.result(timeout=0.1)
-                            
-                            if score > current_best_score:
-                                current_best_score = score
-                                current_best_move = move
-                        except Exception as e:
-                            print(f"Fehler bei Tiefe {depth}: {e}")
-                            continue
-                    
-                    if current_best_move:
-                        best_move = current_best_move
-                        best_score = current_best_score
+            while time.time() - start_time < self.search_time * 0.8 and \
+                    depth <= MAX_SEARCH_DEPTH:  # 80% der verfügbaren Zeit
+                current_best_move = None
+                current_best_score = -float('inf')
+                
+                futures = {}
+                for move in legal_moves:
+                    stats = {'nodes': 0}  # Eigener Zähler je Thread, kein Lock nötig
+                    node_stats.append(stats)
+                    futures[executor.submit(
+                        self.evaluate_move_with_depth,
+                        move,
+                        depth,
+                        start_time,
+                        stats
+                    )] = move
+                
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        move = futures[future]
+                        score = future.result(timeout=0.1)
                         
+                        if score > current_best_score:
+                            current_best_score = score
+                            current_best_move = move
+                    except Exception as e:
+                        print(f"Fehler bei Tiefe {depth}: {e}")
+                        continue
+                
+                # Abgebrochene Iterationen liefern verfälschte Scores und werden nur
+                # übernommen, solange noch kein vollständiges Ergebnis vorliegt
+                completed = time.time() - start_time <= self.search_time
+                if current_best_move and (completed or best_move is None):
+                    best_move = current_best_move
+                    best_score = current_best_score
+                    best_depth = depth
+                    
                 depth += 1
                 
         except concurrent.futures.TimeoutError:
             print(f"Iterative Deepening beendet bei Tiefe {depth-1}")
         
+        self.last_search_info = {
+            'score': best_score,
+            'depth': best_depth,
+            'nodes': sum(stats['nodes'] for stats in node_stats),
+            'time': time.time() - start_time
+        }
         return best_move or random.choice(legal_moves)
 
-    def evaluate_move_with_depth(self, move, depth, start_time):
+    def evaluate_move_with_depth(self, move, depth, start_time, stats=None):
         """Bewertet einen Zug mit bestimmter Tiefe."""
         board_copy = self.board.copy()  # Erstelle eine Kopie des Boards
         board_copy.push(move)
@@ -131,9 +210,9 @@ class ChessEnv:
             depth,
             -float('inf'),
             float('inf'),
-            self.transposition_table,
             start_time,
-            self.search_time
+            self.search_time,
+            stats=stats
         )
 
     def evaluate_move(self, move: chess.Move, start_time: float = None) -> float:
@@ -186,24 +265,59 @@ class ChessEnv:
         return score
 
 
-        MATERIAL_VALUES = np.array([0, 1, 3, 3, 5, 9, 1000])  # [None, P, N, B, R, Q, K]
+def make_worker_env(search_time: float = 1.0) -> 'ChessEnv':
+    """Legt die warme Engine eines Worker-Prozesses an (ein Such-Thread je Prozess).
+
+    Für Initializer von Prozesspools: die Parallelität kommt aus den Prozessen.
+    """
+    set_search_threads(1)
+    return ChessEnv(None, None, search_time)
+
+
+def search_fen(env: 'ChessEnv', fen: str, search_time: float) -> dict:
+    """Sucht mit env in der Stellung fen und gibt Zug und Suchinfo als JSON-taugliches Dict zurück.
+
+    Nicht endliche Scores (keine abgeschlossene Iteration) werden als None gemeldet.
+    """
+    import math
+
+    env.search_time = search_time
+    env.board = chess.Board(fen)
+    best_move = env.get_ai_move()
+    info = env.last_search_info
+    score = info.get('score')
+    return {
+        'best_move': best_move.uci() if best_move else None,
+        'score': score if score is not None and math.isfinite(score) else None,
+        'depth': info.get('depth', 0),
+        'nodes': info.get('nodes', 0),
+        'time': info.get('time', 0.0)
+    }
 
 def minimax(
         board: chess.Board,
         depth: int,
         alpha: float = -float('inf'),
         beta: float = float('inf'),
-        transposition_table: dict = None,
         start_time: float = None,
         time_limit: float = None,
-        thread_pool: concurrent.futures.ThreadPoolExecutor = None
+        thread_pool: 'concurrent.futures.ThreadPoolExecutor' = None,
+        stats: dict = None
 ) -> float:
     """Multithreaded Minimax mit Alpha-Beta Pruning."""
+    if stats is not None:
+        stats['nodes'] += 1
+
     if start_time and time.time() - start_time > time_limit:
         return float('-inf')
 
     if depth == 0 or board.is_game_over():
-        return evaluate_position(board)
+        return evaluate_position(board, alpha, beta)
+
+    # Bekanntes Remis-Endspiel: exaktes Ergebnis statt weiterer Suche. Gewonnene
+    # Endspiele werden weiter durchsucht, damit der Gewinn auch umgesetzt wird.
+    if bitbases.probe(board) == 0:
+        return 0.0
 
     moves = list(board.legal_moves)
     moves.sort(key=lambda m: rate_move(board, m), reverse=True)
@@ -212,10 +326,13 @@ def minimax(
 
     for move in moves:
         # Prüfe auf schlechte Schlagzüge
-        material_change = _global_evaluator.evaluate_material_change(board, move)
+        material_change = get_evaluator().evaluate_material_change(board, move)
         
         board.push(move)
-        score = -minimax(board, depth - 1, -beta, -alpha, transposition_table, start_time, time_limit)
+        # Das Fenster des Kindes um die Materialänderung verschieben, damit Lazy-Cutoffs
+        # gegen das echte Fenster des Elternknotens genommen werden
+        score = -minimax(board, depth - 1, -beta + material_change, -alpha + material_change,
+                         start_time, time_limit, stats=stats)
         
         # Füge Materialänderungsbewertung hinzu
         score += material_change
@@ -282,49 +399,29 @@ def rate_move(board: chess.Board, move: chess.Move) -> float:
 
     return score
 
-def evaluate_position(board: chess.Board) -> float:
-    """Erweiterte Stellungsbewertung."""
-    base_score = _global_evaluator.evaluate_board(board)
-    
-    # Zusätzliche Eröffnungsbewertung
-    if board.fullmove_number <= 10:
-        development_score = 0.0
-        
-        # Bewerte Entwicklung und Zentrumskontrolle
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece:
-                # Zentrumsbonus für Bauern
-                if piece.piece_type == chess.PAWN:
-                    if square in [27, 28, 35, 36]:  # e4, d4, e5, d5
-                        development_score += 0.5 if piece.color == chess.WHITE else -0.5
-                
-                # Malus für frühe Damenzüge
-                elif piece.piece_type == chess.QUEEN:
-                    if (piece.color == chess.WHITE and square != chess.D1) or \
-                       (piece.color == chess.BLACK and square != chess.D8):
-                        development_score -= 0.3 if piece.color == chess.WHITE else -0.3
-                
-                # Bonus für entwickelte Leichtfiguren
-                elif piece.piece_type in [chess.KNIGHT, chess.BISHOP]:
-                    if (piece.color == chess.WHITE and chess.square_rank(square) > 1) or \
-                       (piece.color == chess.BLACK and chess.square_rank(square) < 6):
-                        development_score += 0.4 if piece.color == chess.WHITE else -0.4
+def evaluate_position(board: chess.Board, alpha: float = -float('inf'), beta: float = float('inf')) -> float:
+    """Stellungsbewertung aus Sicht der Seite am Zug.
 
-        base_score += development_score
+    alpha/beta werden als Fenster an die Lazy Evaluation des Evaluators weitergereicht.
+    """
+    if not board.is_checkmate():
+        bitbase_score = bitbases.probe_score(board)
+        if bitbase_score is not None:
+            return bitbase_score
 
-    multiplier = 1 if board.turn == chess.WHITE else -1
-    return base_score * multiplier
+    if board.turn == chess.WHITE:
+        return get_evaluator().evaluate_board(board, alpha, beta)
+    return -get_evaluator().evaluate_board(board, -beta, -alpha)
 
-def process_move(board, move, depth, alpha, beta, tt, start_time, time_limit):
+def process_move(board, move, depth, alpha, beta, start_time, time_limit):
     board.push(move)
-    score = minimax(board, depth - 1, alpha, beta, tt, start_time, time_limit)
+    score = minimax(board, depth - 1, alpha, beta, start_time, time_limit)
     board.pop()
     return score
 
 def quiescence(board: chess.Board, alpha: float, beta: float) -> float:
     """Quiescence Search zur Vermeidung von Horizonteffekten."""
-    score = _global_evaluator.evaluate_board(board)
+    score = get_evaluator().evaluate_board(board)
     if not board.turn:  # Für Schwarz negieren
         score = -score
         
@@ -1,6 +1,7 @@
 import chess
 import pygame
 from ChessEnv import ChessEnv
+from game_records import GameRecordWriter
 import time
 clock = pygame.time.Clock()
 
@@ -17,6 +18,9 @@ COLORS = {
 WHITE = (238, 238, 210)
 BLACK = (118, 150, 86)
 
+# Gespielte Partien werden hier gespeichert (siehe game_records.py)
+GAME_RECORD_PATH = "games.bin"
+
 # Fenstergröße
 WIDTH, HEIGHT = 800, 800
 SQUARE_SIZE = WIDTH // 8
@@ -58,18 +62,26 @@ class GUI:
         self.env = None
         self.buttons = []
         self.show_end_screen = False
+        self.game_store = GameRecordWriter(GAME_RECORD_PATH)
+        self.move_times = []
 
 
         self.init_main_menu()
 
-        # Figuren laden
-        self.piece_images = {
-            piece: pygame.image.load(f"pieces/{'w' if piece.isupper() else 'b'}{piece.upper()}.svg")
-            for piece in "PNBRQKpnbrqk"
-        }
+        self._piece_images = None  # Figuren werden beim ersten Zeichnen geladen
 
         self.selected_square = None
 
+    @property
+    def piece_images(self):
+        """Lädt die Figuren-SVGs beim ersten Zugriff."""
+        if self._piece_images is None:
+            self._piece_images = {
+                piece: pygame.image.load(f"pieces/{'w' if piece.isupper() else 'b'}{piece.upper()}.svg")
+                for piece in "PNBRQKpnbrqk"
+            }
+        return self._piece_images
+
     def draw_board(self):
         """Zeichnet das Brett mit a1 und h8 immer weiß."""
         for vis_rank in range(8):  # Visuelle Zeile (0 = oben)
@@ -308,10 +320,12 @@ class GUI:
 
         self.env.board = chess.Board()
         self.selected_square = None
+        self.move_times = []
         self.run_game_loop()
 
     def run_game_loop(self):
         running = True
+        last_move_time = time.time()
         while running:
             if self.game_mode == 'ai_vs_ai' or \
                     (self.game_mode == 'human' and self.env.board.turn != self.player_color):
@@ -321,10 +335,6 @@ class GUI:
                     self.env.board.push(ai_move)
                     print(f"KI-Zug: {ai_move.uci()}")
 
-                    if self.env.board.is_game_over():
-                        self.show_end_screen= True
-                        running = False
-
             self.draw_board()
             self.draw_pieces()
             self.draw_legal_moves()
@@ -340,12 +350,32 @@ class GUI:
                 if self.game_mode == 'human' and event.type == pygame.MOUSEBUTTONDOWN:
                     self.handle_click(event.pos)
 
+            # Bedenkzeit für jeden neuen Zug (KI oder Mensch) festhalten
+            while len(self.move_times) < len(self.env.board.move_stack):
+                now = time.time()
+                self.move_times.append(now - last_move_time)
+                last_move_time = now
+
+            if self.env.board.is_game_over():
+                self.save_game()
+                self.show_end_screen = True
+                running = False
+
             pygame.display.flip()
             self.clock.tick(60)
 
         if self.show_end_screen:
             self.display_end_screen()
 
+    def save_game(self):
+        """Speichert die beendete Partie im Partiearchiv."""
+        settings = {'game_mode': self.game_mode, 'search_time': self.search_time,
+                    'player_color': None if self.player_color is None else bool(self.player_color)}
+        try:
+            self.game_store.append(self.env.board.move_stack, self.env.board.result(), settings, self.move_times)
+        except OSError as e:
+            print(f"Partie konnte nicht gespeichert werden: {e}")
+
     def display_end_screen(self):
         # Font außerhalb der Schleife initialisieren
         font = pygame.font.Font(None, 50)
@@ -1,7 +1,11 @@
-from GUI import GUI
-import pygame
+import sys
+
 
 def main():
+    # pygame und die GUI werden nur im GUI-Modus importiert
+    import pygame
+    from GUI import GUI
+
     try:
         pygame.init()
         gui = GUI()
@@ -17,4 +21,8 @@ def main():
         pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        # Mit Argumenten: Kommandozeilen-Engine ohne GUI (siehe cli.py)
+        from cli import main as cli_main
+        raise SystemExit(cli_main())
+    main()
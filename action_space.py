@@ -0,0 +1,95 @@
+import chess
+
+# Aktionsraum wie bei AlphaZero: 64 Startfelder x 73 Zugtypen = 4672 Aktionen.
+# Zugtypen: 56 "Damenzüge" (8 Richtungen x 7 Weiten), 8 Springerzüge und
+# 9 Unterverwandlungen (Springer/Läufer/Turm x links schlagen/gerade/rechts schlagen).
+# Verwandlungen in eine Dame laufen über die Damenzüge.
+QUEEN_DIRECTIONS = [(0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1)]  # (Linie, Reihe)
+KNIGHT_OFFSETS = [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]
+UNDERPROMOTION_PIECES = [chess.KNIGHT, chess.BISHOP, chess.ROOK]
+UNDERPROMOTION_FILE_DELTAS = [-1, 0, 1]
+
+NUM_QUEEN_PLANES = len(QUEEN_DIRECTIONS) * 7
+NUM_KNIGHT_PLANES = len(KNIGHT_OFFSETS)
+MOVE_TYPES = NUM_QUEEN_PLANES + NUM_KNIGHT_PLANES + len(UNDERPROMOTION_PIECES) * len(UNDERPROMOTION_FILE_DELTAS)
+ACTION_SPACE_SIZE = 64 * MOVE_TYPES
+
+
+def _build_tables():
+    """Berechnet die Tabellen Aktion -> Zug und Zug -> Aktion einmalig beim Import."""
+    action_to_move = [None] * ACTION_SPACE_SIZE
+    action_to_promotion = [None] * ACTION_SPACE_SIZE  # Variante mit Damenumwandlung (nur Bauernzüge)
+    move_to_action = {}
+
+    def target(square, file_delta, rank_delta):
+        file = chess.square_file(square) + file_delta
+        rank = chess.square_rank(square) + rank_delta
+        if 0 <= file <= 7 and 0 <= rank <= 7:
+            return chess.square(file, rank)
+        return None
+
+    for from_square in chess.SQUARES:
+        base = from_square * MOVE_TYPES
+        from_rank = chess.square_rank(from_square)
+
+        for direction, (file_step, rank_step) in enumerate(QUEEN_DIRECTIONS):
+            for distance in range(1, 8):
+                to_square = target(from_square, file_step * distance, rank_step * distance)
+                if to_square is None:
+                    break
+                action = base + direction * 7 + distance - 1
+                move = chess.Move(from_square, to_square)
+                action_to_move[action] = move
+                move_to_action[move] = action
+
+                # Ein Schritt vorwärts auf die letzte Reihe kann eine Damenumwandlung sein
+                to_rank = chess.square_rank(to_square)
+                if distance == 1 and ((from_rank == 6 and to_rank == 7) or (from_rank == 1 and to_rank == 0)):
+                    promotion = chess.Move(from_square, to_square, promotion=chess.QUEEN)
+                    action_to_promotion[action] = promotion
+                    move_to_action[promotion] = action
+
+        for offset, (file_delta, rank_delta) in enumerate(KNIGHT_OFFSETS):
+            to_square = target(from_square, file_delta, rank_delta)
+            if to_square is not None:
+                action = base + NUM_QUEEN_PLANES + offset
+                move = chess.Move(from_square, to_square)
+                action_to_move[action] = move
+                move_to_action[move] = action
+
+        # Unterverwandlungen: Weiß zieht von Reihe 7 nach 8, Schwarz von 2 nach 1
+        if from_rank in (1, 6):
+            rank_delta = 1 if from_rank == 6 else -1
+            for piece_index, piece_type in enumerate(UNDERPROMOTION_PIECES):
+                for delta_index, file_delta in enumerate(UNDERPROMOTION_FILE_DELTAS):
+                    to_square = target(from_square, file_delta, rank_delta)
+                    if to_square is None:
+                        continue
+                    action = (base + NUM_QUEEN_PLANES + NUM_KNIGHT_PLANES +
+                              piece_index * len(UNDERPROMOTION_FILE_DELTAS) + delta_index)
+                    move = chess.Move(from_square, to_square, promotion=piece_type)
+                    action_to_move[action] = move
+                    move_to_action[move] = action
+
+    return action_to_move, action_to_promotion, move_to_action
+
+
+ACTION_TO_MOVE, ACTION_TO_PROMOTION, MOVE_TO_ACTION = _build_tables()
+
+
+def encode_move(move: chess.Move) -> int:
+    """Gibt den Aktionsindex eines Zuges zurück (KeyError bei nicht darstellbaren Zügen)."""
+    return MOVE_TO_ACTION[move]
+
+
+def decode_action(action: int, board: chess.Board) -> chess.Move:
+    """Gibt den Zug zu einem Aktionsindex zurück; None, wenn die Aktion geometrisch unmöglich ist.
+
+    Das Brett wird nur benötigt, um Bauernzüge auf die letzte Reihe als Damenumwandlung zu lesen.
+    """
+    if not 0 <= action < ACTION_SPACE_SIZE:
+        raise ValueError(f"Aktion außerhalb des Aktionsraums: {action}")
+    promotion = ACTION_TO_PROMOTION[action]
+    if promotion is not None and board.pawns & chess.BB_SQUARES[promotion.from_square]:
+        return promotion
+    return ACTION_TO_MOVE[action]
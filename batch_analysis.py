@@ -0,0 +1,171 @@
+import argparse
+import collections
+import concurrent.futures
+import json
+import os
+
+import chess
+import chess.pgn
+
+from ChessEnv import make_worker_env, search_fen
+
+# Warme Engine je Worker-Prozess (wird im Initializer gesetzt)
+_worker_env = None
+
+
+def iter_positions(path: str):
+    """Liest Stellungen als Stream aus einer PGN- oder FEN/EPD-Datei und liefert (id, fen, fehler).
+
+    Bei unlesbaren Zeilen ist fen None und fehler die Meldung, sonst ist fehler None.
+    """
+    if path.lower().endswith('.pgn'):
+        yield from _iter_pgn_positions(path)
+    else:
+        yield from _iter_fen_positions(path)
+
+
+def _iter_pgn_positions(path: str):
+    """Liefert jede Stellung jeder Partie, ohne die ganze Datei zu laden."""
+    with open(path, encoding='utf-8', errors='replace') as handle:
+        game_number = 0
+        while True:
+            game = chess.pgn.read_game(handle)
+            if game is None:
+                break
+            game_number += 1
+            board = game.board()
+            yield f"{game_number}:0", board.fen(), None
+            for ply, move in enumerate(game.mainline_moves(), start=1):
+                board.push(move)
+                yield f"{game_number}:{ply}", board.fen(), None
+
+
+def _parse_fen_line(line: str):
+    """Liest FEN, EPD oder FEN mit Zugzählern und anschließenden EPD-Operationen.
+
+    Gibt (Brett, Operationen) zurück; wirft ValueError bei ungültigen Zeilen.
+    """
+    fields = line.split()
+    if len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit():
+        # Zugzähler abtrennen, den Rest als EPD lesen und die Zähler danach setzen
+        board, operations = chess.Board.from_epd(' '.join(fields[:4] + fields[6:]))
+        board.halfmove_clock = int(fields[4])
+        board.fullmove_number = int(fields[5])
+        return board, operations
+    return chess.Board.from_epd(line)
+
+
+def _iter_fen_positions(path: str):
+    """Liefert eine Stellung pro Zeile; EPD-Operationen (z.B. id) werden ausgewertet.
+
+    Ungültige Zeilen brechen den Lauf nicht ab, sondern werden als Fehler gemeldet.
+    """
+    with open(path, encoding='utf-8', errors='replace') as handle:
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                board, operations = _parse_fen_line(line)
+            except ValueError as e:
+                yield str(line_number), None, f"Zeile {line_number}: {e}"
+                continue
+            yield str(operations.get('id', line_number)), board.fen(), None
+
+
+def _init_worker(search_time: float):
+    global _worker_env
+    _worker_env = make_worker_env(search_time)
+
+
+def _analyse_position(position_id: str, fen: str) -> dict:
+    """Analysiert eine Stellung mit der warmen Engine des Workers."""
+    result = search_fen(_worker_env, fen, _worker_env.search_time)
+    return {'id': position_id, 'fen': fen, **result, 'time': round(result['time'], 3)}
+
+
+def analyse_stream(positions, workers: int, search_time: float, max_pending: int = None):
+    """Verteilt Stellungen auf einen Prozesspool und liefert Ergebnisse in Eingabereihenfolge.
+
+    Es sind nie mehr als max_pending Aufträge gleichzeitig offen, der Speicherbedarf bleibt
+    also unabhängig von der Dateigröße. Unlesbare Stellungen ergeben einen Eintrag
+    {"id", "error"} an ihrer Position, damit die Ausgabe zeilengenau zur Eingabe passt.
+    """
+    max_pending = max_pending or workers * 4
+    pending = collections.deque()
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                initargs=(search_time,)) as executor:
+        for position_id, fen, error in positions:
+            if error is not None:
+                future = concurrent.futures.Future()
+                future.set_result({'id': position_id, 'error': error})
+                pending.append(future)
+            else:
+                pending.append(executor.submit(_analyse_position, position_id, fen))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def _completed_count(output_path: str) -> int:
+    """Zählt vollständige Zeilen einer vorhandenen Ausgabe und kürzt eine abgebrochene letzte Zeile."""
+    if not os.path.exists(output_path):
+        return 0
+
+    count = 0
+    valid_size = 0
+    with open(output_path, 'rb') as handle:
+        for line in handle:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            count += 1
+            valid_size += len(line)
+
+    if valid_size != os.path.getsize(output_path):
+        with open(output_path, 'r+b') as handle:
+            handle.truncate(valid_size)
+    return count
+
+
+def run_batch(input_path: str, output_path: str, workers: int, search_time: float,
+              resume: bool = False) -> int:
+    """Analysiert alle Stellungen der Eingabe und schreibt JSONL; gibt die Anzahl neuer Zeilen zurück."""
+    skip = _completed_count(output_path) if resume else 0
+    positions = iter_positions(input_path)
+    for _ in range(skip):
+        if next(positions, None) is None:
+            return 0
+
+    written = 0
+    with open(output_path, 'a' if resume else 'w', encoding='utf-8') as output:
+        for index, result in enumerate(analyse_stream(positions, workers, search_time), start=skip):
+            result = {'index': index, **result}
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+            written += 1
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-Analyse von PGN- oder FEN/EPD-Dateien.")
+    parser.add_argument('input', help="PGN- oder FEN/EPD-Datei")
+    parser.add_argument('output', help="Ausgabedatei (JSONL)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Anzahl Worker-Prozesse")
+    parser.add_argument('--time', type=float, default=1.0, help="Rechenzeit pro Stellung in Sekunden")
+    parser.add_argument('--resume', action='store_true', help="Abgebrochenen Lauf fortsetzen")
+    args = parser.parse_args(argv)
+
+    written = run_batch(args.input, args.output, args.workers, args.time, args.resume)
+    print(f"{written} Stellungen analysiert")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,345 @@
+import argparse
+import os
+import time
+from array import array
+
+import chess
+
+# Gewinn/Remis-Bitbasen für KPK, KRK und KQK, erzeugt per Retrograder Analyse.
+# Die starke Seite wird immer auf Weiß normiert (bei Schwarz wird das Brett vertikal
+# gespiegelt). Ein Bit pro Stellung: 1 = die starke Seite gewinnt, 0 = Remis (oder illegal).
+#
+# Index KPK (Bauer per Spiegelung auf Linie a-d, Reihe 2-7):
+#     ((am_zug * 24 + bauer) * 64 + starker_koenig) * 64 + schwacher_koenig
+# Index KRK/KQK (starker König per 8-facher Symmetrie im Dreieck a1-d1-d4):
+#     ((am_zug * 10 + dreieck) * 64 + schwacher_koenig) * 64 + figur
+# am_zug: 0 = starke Seite, 1 = schwache Seite.
+BITBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bitbases')
+
+TRIANGLE = [chess.A1, chess.B1, chess.C1, chess.D1, chess.B2, chess.C2, chess.D2, chess.C3, chess.D3, chess.D4]
+TRIANGLE_INDEX = {square: index for index, square in enumerate(TRIANGLE)}
+
+TABLE_SIZES = {
+    'kpk': 2 * 24 * 64 * 64,
+    'krk': 2 * 10 * 64 * 64,
+    'kqk': 2 * 10 * 64 * 64,
+}
+ENDGAME_PIECES = {chess.PAWN: 'kpk', chess.ROOK: 'krk', chess.QUEEN: 'kqk'}
+
+# Bewertung gewonnener Stellungen: unter dem Mattwert, damit Matts bevorzugt werden.
+# Der Zuschlag je Endspiel liegt über jedem KPK-Fortschritt, damit Umwandeln sich lohnt.
+BITBASE_WIN_SCORE = 10000.0
+ENDGAME_BONUS = {'kpk': 0.0, 'krk': 500.0, 'kqk': 900.0}
+
+_tables = {}
+
+
+# ---------------------------------------------------------------------------
+# Indizierung
+# ---------------------------------------------------------------------------
+
+def kpk_index(strong_king: int, weak_king: int, pawn: int, side: int) -> int:
+    if chess.square_file(pawn) > 3:
+        strong_king, weak_king, pawn = strong_king ^ 7, weak_king ^ 7, pawn ^ 7
+    pawn_index = (chess.square_rank(pawn) - 1) * 4 + chess.square_file(pawn)
+    return ((side * 24 + pawn_index) * 64 + strong_king) * 64 + weak_king
+
+
+def piece_index(strong_king: int, weak_king: int, piece: int, side: int) -> int:
+    file = chess.square_file(strong_king)
+    rank = chess.square_rank(strong_king)
+    flip_file = file > 3
+    flip_rank = rank > 3
+    if flip_file:
+        file = 7 - file
+    if flip_rank:
+        rank = 7 - rank
+    flip_diagonal = rank > file
+
+    def transform(square):
+        f, r = chess.square_file(square), chess.square_rank(square)
+        if flip_file:
+            f = 7 - f
+        if flip_rank:
+            r = 7 - r
+        if flip_diagonal:
+            f, r = r, f
+        return chess.square(f, r)
+
+    triangle = TRIANGLE_INDEX[transform(strong_king)]
+    return ((side * 10 + triangle) * 64 + transform(weak_king)) * 64 + transform(piece)
+
+
+def _decode(name: str, index: int):
+    """Gegenstück zu den Indexfunktionen: (starker König, schwacher König, Figur, am Zug)."""
+    if name == 'kpk':
+        weak_king = index % 64
+        strong_king = index // 64 % 64
+        pawn_index = index // 4096 % 24
+        side = index // (4096 * 24)
+        return strong_king, weak_king, chess.square(pawn_index % 4, pawn_index // 4 + 1), side
+    piece = index % 64
+    weak_king = index // 64 % 64
+    strong_king = TRIANGLE[index // 4096 % 10]
+    side = index // 40960
+    return strong_king, weak_king, piece, side
+
+
+def _index(name: str, strong_king: int, weak_king: int, piece: int, side: int) -> int:
+    if name == 'kpk':
+        return kpk_index(strong_king, weak_king, piece, side)
+    return piece_index(strong_king, weak_king, piece, side)
+
+
+# ---------------------------------------------------------------------------
+# Erzeugung (Retrograde Analyse)
+# ---------------------------------------------------------------------------
+
+def _attacks(piece_type: int, square: int, occupied: int) -> int:
+    if piece_type == chess.PAWN:
+        return chess.BB_PAWN_ATTACKS[chess.WHITE][square]
+    attacks = 0
+    if piece_type in (chess.ROOK, chess.QUEEN):
+        attacks |= chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied]
+        attacks |= chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied]
+    if piece_type == chess.QUEEN:
+        attacks |= chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied]
+    return attacks
+
+
+def _successors(name: str, piece_type: int, strong_king: int, weak_king: int, piece: int, side: int,
+                solved: dict):
+    """Gibt (Folgestellungen, Remis-Flucht, sofortiger Gewinn) zurück oder None für illegale Stellungen.
+
+    Remis-Flucht: die schwache Seite kann die Figur schlagen.
+    Sofortiger Gewinn: eine Bauernumwandlung führt in eine gewonnene KQK/KRK-Stellung.
+    """
+    if len({strong_king, weak_king, piece}) < 3 or chess.BB_KING_ATTACKS[strong_king] & chess.BB_SQUARES[weak_king]:
+        return None
+
+    occupied = chess.BB_SQUARES[strong_king] | chess.BB_SQUARES[weak_king] | chess.BB_SQUARES[piece]
+    weak_in_check = bool(_attacks(piece_type, piece, occupied) & chess.BB_SQUARES[weak_king])
+    successors = set()
+
+    if side == 0:
+        if weak_in_check:
+            return None  # Schwarz hätte im Schach stehen bleiben müssen
+
+        immediate_win = False
+        for target in chess.scan_forward(chess.BB_KING_ATTACKS[strong_king] & ~occupied):
+            if not chess.BB_KING_ATTACKS[weak_king] & chess.BB_SQUARES[target]:
+                successors.add(_index(name, target, weak_king, piece, 1))
+
+        if piece_type == chess.PAWN:
+            pushes = []
+            one = piece + 8
+            if not occupied & chess.BB_SQUARES[one]:
+                pushes.append(one)
+                if chess.square_rank(piece) == 1 and not occupied & chess.BB_SQUARES[piece + 16]:
+                    pushes.append(piece + 16)
+            for target in pushes:
+                if chess.square_rank(target) == 7:
+                    # Umwandlung in Dame oder Turm (Springer/Läufer reichen nie zum Gewinn)
+                    for promoted in ('kqk', 'krk'):
+                        if _probe_table(solved[promoted], piece_index(strong_king, weak_king, target, 1)):
+                            immediate_win = True
+                else:
+                    successors.add(_index(name, strong_king, weak_king, target, 1))
+        else:
+            targets = _attacks(piece_type, piece, occupied) & ~occupied
+            for target in chess.scan_forward(targets):
+                successors.add(_index(name, strong_king, weak_king, target, 1))
+
+        return successors, False, immediate_win
+
+    draw_escape = False
+    attacked_without_king = _attacks(piece_type, piece, occupied & ~chess.BB_SQUARES[weak_king])
+    for target in chess.scan_forward(chess.BB_KING_ATTACKS[weak_king]):
+        if chess.BB_KING_ATTACKS[strong_king] & chess.BB_SQUARES[target]:
+            continue
+        if target == piece:
+            draw_escape = True  # ungedeckte Figur wird geschlagen -> KK
+            continue
+        if attacked_without_king & chess.BB_SQUARES[target]:
+            continue
+        successors.add(_index(name, strong_king, target, piece, 0))
+
+    if not successors and not draw_escape and not weak_in_check:
+        draw_escape = True  # Patt
+    return successors, draw_escape, False
+
+
+def generate_table(name: str, solved: dict = None) -> bytes:
+    """Löst ein Endspiel per Retrograder Analyse und gibt die Bitbasis als Bytes zurück."""
+    piece_type = {v: k for k, v in ENDGAME_PIECES.items()}[name]
+    size = TABLE_SIZES[name]
+    solved = solved or {}
+
+    # Vorwärtskanten einmal erzeugen und zu Vorgängerlisten umdrehen
+    edge_from = array('i')
+    edge_to = array('i')
+    remaining = array('i', [0]) * size  # Weiß-am-Zug: unbenutzt; Schwarz-am-Zug: offene Nachfolger
+    win = bytearray(size)
+    queue = []
+
+    for index in range(size):
+        strong_king, weak_king, piece, side = _decode(name, index)
+        result = _successors(name, piece_type, strong_king, weak_king, piece, side, solved)
+        if result is None:
+            continue
+        successors, draw_escape, immediate_win = result
+
+        for successor in successors:
+            edge_from.append(index)
+            edge_to.append(successor)
+
+        if side == 1:
+            # Mit Remis-Flucht nie gewonnen; ohne Züge und ohne Flucht ist es Matt
+            remaining[index] = -1 if draw_escape else len(successors)
+            if not successors and not draw_escape:
+                win[index] = 1
+                queue.append(index)
+        elif immediate_win:
+            win[index] = 1
+            queue.append(index)
+
+    order = sorted(range(len(edge_to)), key=edge_to.__getitem__)
+    predecessor_start = array('i', [0]) * (size + 1)
+    for target in edge_to:
+        predecessor_start[target + 1] += 1
+    for index in range(size):
+        predecessor_start[index + 1] += predecessor_start[index]
+    predecessors = array('i', (edge_from[edge] for edge in order))
+
+    # Gewinne rückwärts propagieren
+    while queue:
+        index = queue.pop()
+        for edge in range(predecessor_start[index], predecessor_start[index + 1]):
+            predecessor = predecessors[edge]
+            if win[predecessor]:
+                continue
+            if predecessor < size // 2:  # Weiß am Zug: ein gewinnender Zug genügt
+                win[predecessor] = 1
+                queue.append(predecessor)
+            elif remaining[predecessor] > 0:  # Schwarz am Zug: alle Züge müssen verlieren
+                remaining[predecessor] -= 1
+                if remaining[predecessor] == 0:
+                    win[predecessor] = 1
+                    queue.append(predecessor)
+
+    packed = bytearray((size + 7) // 8)
+    for index in range(size):
+        if win[index]:
+            packed[index >> 3] |= 1 << (index & 7)
+    return bytes(packed)
+
+
+def generate_all(directory: str = BITBASE_DIR):
+    """Erzeugt alle Bitbasen (KQK und KRK zuerst, KPK braucht sie für Umwandlungen)."""
+    os.makedirs(directory, exist_ok=True)
+    solved = {}
+    for name in ('kqk', 'krk', 'kpk'):
+        start_time = time.perf_counter()
+        solved[name] = generate_table(name, solved)
+        with open(os.path.join(directory, f'{name}.bin'), 'wb') as handle:
+            handle.write(solved[name])
+        wins = sum(bin(byte).count('1') for byte in solved[name])
+        print(f"{name}: {wins} Gewinnstellungen, {len(solved[name])} Bytes "
+              f"({time.perf_counter() - start_time:.1f}s)")
+
+
+# ---------------------------------------------------------------------------
+# Abfrage
+# ---------------------------------------------------------------------------
+
+def _probe_table(table: bytes, index: int) -> bool:
+    return bool(table[index >> 3] >> (index & 7) & 1)
+
+
+def _load_table(name: str):
+    table = _tables.get(name)
+    if table is None:
+        path = os.path.join(BITBASE_DIR, f'{name}.bin')
+        with open(path, 'rb') as handle:
+            table = handle.read()
+        if len(table) != (TABLE_SIZES[name] + 7) // 8:
+            raise ValueError(f"Bitbasis {path} hat eine falsche Größe")
+        _tables[name] = table
+    return table
+
+
+def _classify(board: chess.Board):
+    """Erkennt KPK/KRK/KQK und gibt (Name, starke Farbe, Figurtyp) zurück, sonst None."""
+    if chess.popcount(board.occupied) != 3:
+        return None
+    for color in chess.COLORS:
+        own = board.occupied_co[color] & ~board.kings
+        if own:
+            piece_type = board.piece_type_at(chess.lsb(own))
+            name = ENDGAME_PIECES.get(piece_type)
+            return (name, color, piece_type) if name else None
+    return None
+
+
+def probe(board: chess.Board):
+    """Exaktes Ergebnis aus Sicht der Seite am Zug: 1 Gewinn, 0 Remis, -1 Verlust; None, wenn nicht abgedeckt."""
+    classified = _classify(board)
+    if classified is None:
+        return None
+    name, strong_color, piece_type = classified
+
+    flip = 0 if strong_color == chess.WHITE else 56
+    strong_king = board.king(strong_color) ^ flip
+    weak_king = board.king(not strong_color) ^ flip
+    piece = chess.lsb(board.pieces_mask(piece_type, strong_color)) ^ flip
+    side = 0 if board.turn == strong_color else 1
+
+    if not _probe_table(_load_table(name), _index(name, strong_king, weak_king, piece, side)):
+        return 0
+    return 1 if side == 0 else -1
+
+
+def probe_score(board: chess.Board):
+    """Bewertung aus Sicht der Seite am Zug für abgedeckte Endspiele, sonst None.
+
+    Gewonnene Stellungen erhalten BITBASE_WIN_SCORE plus einen Fortschrittsterm
+    (schwacher König am Rand, mit wenig Fluchtfeldern und nahe am starken König, bzw.
+    Bauernfortschritt mit König nahe am Bauern), damit die Suche den Gewinn auch umsetzt.
+    """
+    result = probe(board)
+    if result is None:
+        return None
+    if result == 0:
+        return 0.0
+    name = _classify(board)[0]
+
+    strong_color = board.turn if result == 1 else not board.turn
+    strong_king = board.king(strong_color)
+    weak_king = board.king(not strong_color)
+    if board.pawns:
+        pawn = chess.lsb(board.pawns)
+        rank = chess.square_rank(pawn)
+        progress = 50 * (rank if strong_color == chess.WHITE else 7 - rank)
+        progress += 10 * (7 - chess.square_distance(strong_king, pawn))
+    else:
+        weak_file, weak_rank = chess.square_file(weak_king), chess.square_rank(weak_king)
+        center_distance = max(3 - weak_file, weak_file - 4) + max(3 - weak_rank, weak_rank - 4)
+        progress = 20 * center_distance + 10 * (14 - chess.square_manhattan_distance(strong_king, weak_king))
+        # Wenige Fluchtfelder für den schwachen König bringen das Matt in Suchreichweite
+        free_squares = sum(1 for square in chess.scan_forward(chess.BB_KING_ATTACKS[weak_king])
+                           if not board.is_attacked_by(strong_color, square))
+        progress += 15 * (8 - free_squares)
+
+    return result * (BITBASE_WIN_SCORE + ENDGAME_BONUS[name] + progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Erzeugt die KPK-, KRK- und KQK-Bitbasen.")
+    parser.add_argument('--output', default=BITBASE_DIR, help="Zielverzeichnis")
+    args = parser.parse_args(argv)
+    generate_all(args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import chess
+
+# Bewusst nur der Such- und Bewertungskern: kein pygame, kein NumPy beim Start.
+from ChessEnv import ChessEnv, evaluate_position, get_evaluator, minimax, search_fen
+
+BENCH_POSITIONS = [
+    chess.STARTING_FEN,
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+    'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+    'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+    '8/8/8/8/8/4k3/4P3/4K3 w - - 0 1',
+]
+
+IMPORT_BENCH_MODULES = ['chess', 'evaluate_board', 'ChessEnv', 'cli', 'numpy', 'pygame']
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"keine ganze Zahl: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError("muss mindestens 1 sein")
+    return number
+
+
+def _fen(value: str) -> str:
+    """Prüft die FEN schon beim Parsen der Argumente (Fehlermeldung statt Traceback)."""
+    try:
+        return chess.Board(value).fen()
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"ungültige FEN: {e}")
+
+
+def _search(fen: str, search_time: float) -> dict:
+    return search_fen(ChessEnv(None, None, search_time), fen, search_time)
+
+
+def cmd_analyse(args):
+    board = chess.Board(args.fen)
+    static_score = evaluate_position(board)
+    info = _search(args.fen, args.time)
+    print(f"Statische Bewertung: {static_score:.1f} (Sicht der Seite am Zug)")
+    if info['best_move'] is None:
+        print("Keine legalen Züge")
+        return 0
+    score = f"{info['score']:.1f}" if info['score'] is not None else "-"
+    print(f"Bester Zug: {info['best_move']} ({board.san(chess.Move.from_uci(info['best_move']))})")
+    print(f"Score: {score}  Tiefe: {info['depth']}  Knoten: {info['nodes']}  "
+          f"Zeit: {info['time']:.2f}s")
+    return 0
+
+
+def cmd_bestmove(args):
+    best_move = _search(args.fen, args.time)['best_move']
+    print(f"bestmove {best_move or '(none)'}")
+    return 0
+
+
+def cmd_bench(args):
+    """Feste Tiefe auf festen Stellungen: Knotenzahl ist reproduzierbar, Knoten/s vergleichbar."""
+    total_nodes = 0
+    start_time = time.perf_counter()
+    for fen in BENCH_POSITIONS:
+        board = chess.Board(fen)
+        stats = {'nodes': 0}
+        position_start = time.perf_counter()
+        for move in list(board.legal_moves):
+            board.push(move)
+            minimax(board, args.depth - 1, stats=stats)
+            board.pop()
+        elapsed = time.perf_counter() - position_start
+        total_nodes += stats['nodes']
+        print(f"{fen}: {stats['nodes']} Knoten in {elapsed:.2f}s")
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Gesamt: {total_nodes} Knoten in {elapsed:.2f}s ({total_nodes / elapsed:,.0f} Knoten/s)")
+    print(f"Caches: {get_evaluator().cache_stats()}")
+    return 0
+
+
+def cmd_importtime(args):
+    """Misst die Importzeit einzelner Module jeweils in einem frischen Interpreter."""
+    modules = args.modules or IMPORT_BENCH_MODULES
+    for module in modules:
+        code = (f"import time; start = time.perf_counter(); import {module}; "
+                f"print(time.perf_counter() - start)")
+        timings = []
+        for _ in range(args.repeat):
+            result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)))
+            if result.returncode != 0:
+                break
+            timings.append(float(result.stdout.strip()))
+        if not timings:
+            print(f"{module}: nicht verfügbar")
+            continue
+        timings.sort()
+        print(f"{module}: {timings[len(timings) // 2] * 1000:.1f} ms (Median aus {len(timings)})")
+    return 0
+
+
+def cmd_gui(args):
+    from Main import main as gui_main
+    gui_main()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Schach-Engine ohne GUI.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    analyse = subparsers.add_parser('analyse', help="Stellung analysieren")
+    analyse.add_argument('fen', type=_fen, help="Stellung als FEN")
+    analyse.add_argument('--time', type=float, default=1.0, help="Rechenzeit in Sekunden")
+    analyse.set_defaults(handler=cmd_analyse)
+
+    bestmove = subparsers.add_parser('bestmove', help="Nur den besten Zug ausgeben")
+    bestmove.add_argument('fen', nargs='?', type=_fen, default=chess.STARTING_FEN, help="Stellung als FEN")
+    bestmove.add_argument('--time', type=float, default=1.0, help="Rechenzeit in Sekunden")
+    bestmove.set_defaults(handler=cmd_bestmove)
+
+    bench = subparsers.add_parser('bench', help="Suchgeschwindigkeit bei fester Tiefe messen")
+    bench.add_argument('--depth', type=_positive_int, default=2, help="Suchtiefe in Halbzügen")
+    bench.set_defaults(handler=cmd_bench)
+
+    importtime = subparsers.add_parser('importtime', help="Importzeiten der Module messen")
+    importtime.add_argument('modules', nargs='*', help=f"Module (Standard: {', '.join(IMPORT_BENCH_MODULES)})")
+    importtime.add_argument('--repeat', type=int, default=5, help="Wiederholungen pro Modul")
+    importtime.set_defaults(handler=cmd_importtime)
+
+    gui = subparsers.add_parser('gui', help="Grafische Oberfläche starten")
+    gui.set_defaults(handler=cmd_gui)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
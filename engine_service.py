@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import concurrent.futures.process
+import json
+import multiprocessing
+import os
+import time
+
+import chess
+
+from ChessEnv import make_worker_env, search_fen
+
+# Warme Engine je Worker-Prozess (wird im Initializer gesetzt)
+_worker_env = None
+
+
+class ServiceBusy(Exception):
+    """Die Warteschlange des Engine-Service ist voll."""
+
+
+class SessionClosed(Exception):
+    """Die Sitzung wurde geschlossen, bevor die Anfrage bearbeitet wurde."""
+
+
+def _init_worker():
+    global _worker_env
+    _worker_env = make_worker_env()
+
+
+def _worker_ready() -> bool:
+    return _worker_env is not None
+
+
+def _worker_search(fen: str, search_time: float) -> dict:
+    """Sucht im Worker-Prozess mit dessen warmer Engine und gibt das Ergebnis zurück."""
+    return search_fen(_worker_env, fen, search_time)
+
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {'p50': None, 'p90': None, 'p99': None}
+    ordered = sorted(values)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99)}
+
+
+class _Request:
+    def __init__(self, session_id, fen, time_budget, future):
+        self.session_id = session_id
+        self.fen = fen
+        self.time_budget = time_budget
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+
+class EngineService:
+    """Asynchroner Engine-Service für viele Partien mit gemeinsamem, festem Prozessbudget.
+
+    Jeder Worker ist ein eigener Prozess mit einem Such-Thread, die Suche selbst hält
+    keinen Zustand je Sitzung; jede Anfrage geht an den nächsten freien Worker. Wartende
+    Anfragen werden reihum über die Sitzungen verteilt (fair), die Gesamtzahl wartender
+    Anfragen ist durch max_queue begrenzt. Stirbt ein Worker-Prozess, wird er ersetzt.
+    """
+
+    def __init__(self, workers: int = None, max_queue: int = 64, min_search_time: float = 0.05,
+                 history_size: int = 1000):
+        self.num_workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.min_search_time = min_search_time
+        self.executors = []
+        self.idle_workers = []
+        self.pending = collections.OrderedDict()  # Sitzung -> deque wartender Anfragen
+        self.queued = 0
+        self.latencies = collections.deque(maxlen=history_size)
+        self.queue_times = collections.deque(maxlen=history_size)
+        self.completed = 0
+        self.rejected = 0
+
+    async def start(self):
+        self.executors = [self._new_executor() for _ in range(self.num_workers)]
+        # Worker-Prozesse gleich starten, damit die erste Anfrage nicht den Prozessstart bezahlt
+        await asyncio.gather(*(asyncio.wrap_future(executor.submit(_worker_ready))
+                               for executor in self.executors))
+        self.idle_workers = list(range(self.num_workers))
+
+    @staticmethod
+    def _new_executor():
+        # Kein fork: ein geforkter Worker erbt die offenen Client-Sockets des Service,
+        # deren Verbindungen dann erst mit dem Worker-Prozess wirklich geschlossen werden
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        return concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                                      initializer=_init_worker)
+
+    def _replace_executor(self, worker: int):
+        """Ersetzt einen (z.B. nach einem Absturz) unbrauchbaren Worker-Prozess."""
+        self.executors[worker].shutdown(wait=False, cancel_futures=True)
+        self.executors[worker] = self._new_executor()
+
+    def _submit(self, worker: int, *args):
+        """Reicht eine Suche beim Worker ein; ein defekter Prozess wird einmal ersetzt."""
+        try:
+            return self.executors[worker].submit(_worker_search, *args)
+        except (concurrent.futures.process.BrokenProcessPool, RuntimeError):
+            self._replace_executor(worker)
+            return self.executors[worker].submit(_worker_search, *args)
+
+    async def close(self):
+        for requests in self.pending.values():
+            for request in requests:
+                request.future.cancel()
+        self.pending.clear()
+        self.queued = 0
+        for executor in self.executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.executors = []
+
+    async def request_move(self, session_id: str, fen: str, time_budget: float = 1.0) -> dict:
+        """Stellt eine Zuganfrage und wartet auf das Ergebnis.
+
+        time_budget ist die gesamte Antwortzeit; die Wartezeit in der Queue wird
+        von der Rechenzeit abgezogen. Wirft ServiceBusy, wenn die Queue voll ist,
+        und SessionClosed, wenn die Sitzung geschlossen wird, solange die Anfrage wartet.
+        """
+        if not self.executors:
+            raise RuntimeError("EngineService wurde nicht gestartet")
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise ServiceBusy(f"Queue voll ({self.max_queue} Anfragen)")
+
+        chess.Board(fen)  # Ungültige FEN sofort melden statt im Worker
+        request = _Request(session_id, fen, time_budget, asyncio.get_running_loop().create_future())
+        self.pending.setdefault(session_id, collections.deque()).append(request)
+        self.queued += 1
+        self._dispatch()
+        return await request.future
+
+    async def close_session(self, session_id: str):
+        """Verwirft die wartenden Anfragen einer Sitzung; ihre Aufrufer erhalten SessionClosed."""
+        for request in self.pending.pop(session_id, ()):
+            if not request.future.done():
+                request.future.set_exception(SessionClosed(f"Sitzung {session_id} wurde geschlossen"))
+            self.queued -= 1
+
+    def stats(self) -> dict:
+        """Latenz- und Queue-Zeit-Perzentile (Sekunden) der letzten Anfragen."""
+        return {
+            'workers': self.num_workers,
+            'busy_workers': self.num_workers - len(self.idle_workers),
+            'queued': self.queued,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'latency': _percentiles(self.latencies),
+            'queue_time': _percentiles(self.queue_times)
+        }
+
+    def _next_request(self):
+        """Nimmt reihum die älteste Anfrage der nächsten Sitzung (Round Robin)."""
+        session_id, requests = next(iter(self.pending.items()))
+        request = requests.popleft()
+        del self.pending[session_id]
+        if requests:
+            self.pending[session_id] = requests  # Sitzung ans Ende der Runde
+        self.queued -= 1
+        return request
+
+    def _dispatch(self):
+        while self.idle_workers and self.pending:
+            request = self._next_request()
+            if request.future.done():
+                continue
+
+            worker = self.idle_workers.pop(0)
+            queue_time = time.perf_counter() - request.enqueued
+            search_time = max(self.min_search_time, request.time_budget - queue_time)
+
+            try:
+                future = asyncio.wrap_future(self._submit(worker, request.fen, search_time))
+            except Exception as e:
+                # Auch der Ersatzprozess nimmt nichts an: Anfrage scheitern lassen, Worker bleibt frei
+                self.idle_workers.append(worker)
+                request.future.set_exception(e)
+                continue
+            future.add_done_callback(
+                lambda done, request=request, worker=worker, queue_time=queue_time:
+                self._finish(request, worker, queue_time, done))
+
+    def _finish(self, request, worker, queue_time, done):
+        if self.executors and not done.cancelled() and \
+                isinstance(done.exception(), concurrent.futures.process.BrokenProcessPool):
+            self._replace_executor(worker)  # Erst ersetzen, dann wieder als frei führen
+        self.idle_workers.append(worker)
+        latency = time.perf_counter() - request.enqueued
+
+        if not request.future.done():
+            if done.cancelled():
+                request.future.cancel()
+            elif done.exception() is not None:
+                request.future.set_exception(done.exception())
+            else:
+                self.completed += 1
+                self.latencies.append(latency)
+                self.queue_times.append(queue_time)
+                request.future.set_result({**done.result(), 'queue_time': queue_time, 'latency': latency})
+
+        self._dispatch()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """JSON-Lines-Protokoll für den lokalen Socket.
+
+        Anfrage: {"session": ..., "fen": ..., "time": ...}, {"cmd": "stats"}
+        oder {"cmd": "close", "session": ...}; jede Antwort ist eine JSON-Zeile.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    command = message.get('cmd', 'move')
+                    if command == 'stats':
+                        response = self.stats()
+                    elif command == 'close':
+                        await self.close_session(str(message['session']))
+                        response = {'closed': message['session']}
+                    else:
+                        response = await self.request_move(str(message['session']), message['fen'],
+                                                           float(message.get('time', 1.0)))
+                except ServiceBusy as e:
+                    response = {'error': 'busy', 'message': str(e)}
+                except SessionClosed as e:
+                    response = {'error': 'closed', 'message': str(e)}
+                except Exception as e:
+                    response = {'error': 'invalid', 'message': str(e)}
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+async def _run(args):
+    service = EngineService(args.workers, args.max_queue)
+    await service.start()
+    try:
+        print(f"Engine-Service läuft auf {args.host}:{args.port} mit {service.num_workers} Workern")
+        await service.serve(args.host, args.port)
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Engine-Service für viele gleichzeitige Partien.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help="Anzahl Worker-Prozesse")
+    parser.add_argument('--max-queue', type=int, default=64, help="Maximale Anzahl wartender Anfragen")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,21 +1,358 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, fields
 import chess
+import json
+import os
 from typing import Dict, Optional
 
+# Getunte Gewichte (siehe tuning.py) werden automatisch geladen, falls vorhanden
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'evaluator_config.json')
+
+# Figuren, deren Materialwert getunt wird (König ist fix)
+TUNABLE_PIECES = 'PNBRQ'
+
+# Spielphase: Springer/Läufer 1, Turm 2, Dame 4 -> 24 in der Ausgangsstellung
+MAX_PHASE = 24
+
+# Piece-Square-Tables für Mittel- (MG) und Endspiel (EG) aus Sicht von Weiß,
+# Index 0 = a8 (wie auf dem Brett gelesen). Werte in Zehnteln von positional_bonus,
+# d.h. maximal 10% des Figurenwerts.
+PST_SCALE = 10.0
+
+PST_MG = {
+    chess.PAWN: (
+         0,   0,   0,   0,   0,   0,   0,   0,
+         5,   5,   5,   5,   5,   5,   5,   5,
+         1,   1,   2,   3,   3,   2,   1,   1,
+         0,   0,   1,   6,   6,   1,   0,   0,
+         0,   0,   1,   8,   8,   1,   0,   0,
+         1,   0,   0,   2,   2,   0,   0,   1,
+         1,   2,   2,  -4,  -4,   2,   2,   1,
+         0,   0,   0,   0,   0,   0,   0,   0,
+    ),
+    chess.KNIGHT: (
+       -10,  -8,  -6,  -6,  -6,  -6,  -8, -10,
+        -8,  -4,   0,   0,   0,   0,  -4,  -8,
+        -6,   0,   2,   3,   3,   2,   0,  -6,
+        -6,   1,   3,   4,   4,   3,   1,  -6,
+        -6,   0,   3,   4,   4,   3,   0,  -6,
+        -6,   1,   2,   3,   3,   2,   1,  -6,
+        -8,  -4,   0,   1,   1,   0,  -4,  -8,
+       -10,  -8,  -6,  -6,  -6,  -6,  -8, -10,
+    ),
+    chess.BISHOP: (
+        -4,  -2,  -2,  -2,  -2,  -2,  -2,  -4,
+        -2,   0,   0,   0,   0,   0,   0,  -2,
+        -2,   0,   1,   2,   2,   1,   0,  -2,
+        -2,   1,   1,   2,   2,   1,   1,  -2,
+        -2,   0,   2,   2,   2,   2,   0,  -2,
+        -2,   2,   2,   2,   2,   2,   2,  -2,
+        -2,   1,   0,   0,   0,   0,   1,  -2,
+        -4,  -2,  -4,  -2,  -2,  -4,  -2,  -4,
+    ),
+    chess.ROOK: (
+         0,   0,   0,   0,   0,   0,   0,   0,
+         1,   2,   2,   2,   2,   2,   2,   1,
+        -1,   0,   0,   0,   0,   0,   0,  -1,
+        -1,   0,   0,   0,   0,   0,   0,  -1,
+        -1,   0,   0,   0,   0,   0,   0,  -1,
+        -1,   0,   0,   0,   0,   0,   0,  -1,
+        -1,   0,   0,   0,   0,   0,   0,  -1,
+         0,   0,   0,   1,   1,   0,   0,   0,
+    ),
+    chess.QUEEN: (
+        -4,  -2,  -2,  -1,  -1,  -2,  -2,  -4,
+        -2,  -1,  -1,  -1,  -1,  -1,  -1,  -2,
+        -2,  -1,   0,   0,   0,   0,  -1,  -2,
+        -1,  -1,   0,   0,   0,   0,  -1,  -1,
+        -1,  -1,   0,   0,   0,   0,  -1,  -1,
+        -2,  -1,   0,   0,   0,   0,  -1,  -2,
+        -2,  -1,  -1,   0,   0,  -1,  -1,  -2,
+        -4,  -2,  -2,   1,  -1,  -2,  -2,  -4,
+    ),
+    chess.KING: (
+        -6,  -8,  -8, -10, -10,  -8,  -8,  -6,
+        -6,  -8,  -8, -10, -10,  -8,  -8,  -6,
+        -6,  -8,  -8, -10, -10,  -8,  -8,  -6,
+        -6,  -8,  -8, -10, -10,  -8,  -8,  -6,
+        -4,  -6,  -6,  -8,  -8,  -6,  -6,  -4,
+        -2,  -4,  -4,  -4,  -4,  -4,  -4,  -2,
+         4,   4,   0,   0,   0,   0,   4,   4,
+         4,   6,   2,   0,   0,   2,   6,   4,
+    ),
+}
+
+PST_EG = {
+    chess.PAWN: (
+         0,   0,   0,   0,   0,   0,   0,   0,
+        10,  10,  10,  10,  10,  10,  10,  10,
+         6,   6,   6,   6,   6,   6,   6,   6,
+         4,   4,   4,   4,   4,   4,   4,   4,
+         2,   2,   2,   2,   2,   2,   2,   2,
+         1,   1,   1,   1,   1,   1,   1,   1,
+         0,   0,   0,   0,   0,   0,   0,   0,
+         0,   0,   0,   0,   0,   0,   0,   0,
+    ),
+    chess.KNIGHT: (
+       -10,  -8,  -6,  -6,  -6,  -6,  -8, -10,
+        -8,  -4,   0,   0,   0,   0,  -4,  -8,
+        -6,   0,   2,   3,   3,   2,   0,  -6,
+        -6,   1,   3,   4,   4,   3,   1,  -6,
+        -6,   0,   3,   4,   4,   3,   0,  -6,
+        -6,   1,   2,   3,   3,   2,   1,  -6,
+        -8,  -4,   0,   1,   1,   0,  -4,  -8,
+       -10,  -8,  -6,  -6,  -6,  -6,  -8, -10,
+    ),
+    chess.BISHOP: (
+        -4,  -2,  -2,  -2,  -2,  -2,  -2,  -4,
+        -2,   0,   0,   0,   0,   0,   0,  -2,
+        -2,   0,   2,   2,   2,   2,   0,  -2,
+        -2,   0,   2,   3,   3,   2,   0,  -2,
+        -2,   0,   2,   3,   3,   2,   0,  -2,
+        -2,   0,   2,   2,   2,   2,   0,  -2,
+        -2,   0,   0,   0,   0,   0,   0,  -2,
+        -4,  -2,  -2,  -2,  -2,  -2,  -2,  -4,
+    ),
+    chess.ROOK: (
+         0,   0,   0,   0,   0,   0,   0,   0,
+         1,   1,   1,   1,   1,   1,   1,   1,
+         0,   0,   0,   0,   0,   0,   0,   0,
+         0,   0,   0,   0,   0,   0,   0,   0,
+         0,   0,   0,   0,   0,   0,   0,   0,
+         0,   0,   0,   0,   0,   0,   0,   0,
+         0,   0,   0,   0,   0,   0,   0,   0,
+         0,   0,   0,   0,   0,   0,   0,   0,
+    ),
+    chess.QUEEN: (
+        -4,  -2,  -2,  -1,  -1,  -2,  -2,  -4,
+        -2,   0,   0,   0,   0,   0,   0,  -2,
+        -2,   0,   1,   1,   1,   1,   0,  -2,
+        -1,   0,   1,   2,   2,   1,   0,  -1,
+        -1,   0,   1,   2,   2,   1,   0,  -1,
+        -2,   0,   1,   1,   1,   1,   0,  -2,
+        -2,   0,   0,   0,   0,   0,   0,  -2,
+        -4,  -2,  -2,  -1,  -1,  -2,  -2,  -4,
+    ),
+    chess.KING: (
+       -10,  -8,  -6,  -4,  -4,  -6,  -8, -10,
+        -6,  -4,  -2,   0,   0,  -2,  -4,  -6,
+        -6,  -2,   4,   6,   6,   4,  -2,  -6,
+        -6,  -2,   6,   8,   8,   6,  -2,  -6,
+        -6,  -2,   6,   8,   8,   6,  -2,  -6,
+        -6,  -2,   4,   6,   6,   4,  -2,  -6,
+        -6,  -6,   0,   0,   0,   0,  -6,  -6,
+       -10,  -6,  -6,  -6,  -6,  -6,  -6, -10,
+    ),
+}
+
+
+def _pst_index(square: chess.Square, color: chess.Color) -> int:
+    """Tabellenindex eines Feldes; für Schwarz wird das Brett vertikal gespiegelt."""
+    return square ^ 56 if color == chess.WHITE else square
+
+
+ADJACENT_FILES = [(chess.BB_FILES[file - 1] if file > 0 else 0) | (chess.BB_FILES[file + 1] if file < 7 else 0)
+                  for file in range(8)]
+
+
+def _build_pawn_masks():
+    """Masken je Farbe und Feld: Felder vor dem Bauern (eigene und Nachbarlinien) und
+    Nachbarlinien auf gleicher Reihe oder dahinter (mögliche Deckung durch eigene Bauern)."""
+    ranks_above = [0] * 8
+    ranks_below = [0] * 8
+    for rank in range(8):
+        for other in range(8):
+            if other > rank:
+                ranks_above[rank] |= chess.BB_RANKS[other]
+            elif other < rank:
+                ranks_below[rank] |= chess.BB_RANKS[other]
+
+    front_spans = [[0] * 64 for _ in chess.COLORS]
+    support_spans = [[0] * 64 for _ in chess.COLORS]
+    for square in chess.SQUARES:
+        file = chess.square_file(square)
+        rank = chess.square_rank(square)
+        files = chess.BB_FILES[file] | ADJACENT_FILES[file]
+        front_spans[chess.WHITE][square] = files & ranks_above[rank]
+        front_spans[chess.BLACK][square] = files & ranks_below[rank]
+        support_spans[chess.WHITE][square] = ADJACENT_FILES[file] & ~ranks_above[rank]
+        support_spans[chess.BLACK][square] = ADJACENT_FILES[file] & ~ranks_below[rank]
+    return front_spans, support_spans
+
+
+PAWN_FRONT_SPANS, PAWN_SUPPORT_SPANS = _build_pawn_masks()
+
+# Erweitertes Zentrum c3-f6 (Feldkontrolle durch Bauern)
+EXTENDED_CENTER = (chess.BB_FILE_C | chess.BB_FILE_D | chess.BB_FILE_E | chess.BB_FILE_F) & \
+    (chess.BB_RANK_3 | chess.BB_RANK_4 | chess.BB_RANK_5 | chess.BB_RANK_6)
+
+# Bauernstruktur-Terme und die zugehörigen Konstanten (in Bauerneinheiten)
+PAWN_STRUCTURE_TERMS = {
+    'doubled': 'DOUBLED_PAWN_PENALTY',
+    'isolated': 'ISOLATED_PAWN_PENALTY',
+    'backward': 'BACKWARD_PAWN_PENALTY',
+    'passed': 'PASSED_PAWN_BONUS',
+    'protected': 'PAWN_STRUCTURE_BONUS',
+    'central': 'CENTRAL_PAWN_BONUS',
+    'control': 'FIELD_CONTROL_BONUS',
+}
+
+# Figurenaktivität und Königssicherheit, ebenfalls in Bauerneinheiten
+PIECE_ACTIVITY_TERMS = {
+    'central_knights': 'CENTRAL_KNIGHT_BONUS',
+    'development': 'MINOR_PIECE_DEVELOPMENT_BONUS',
+    'open_files': 'MAJOR_PIECE_ACTIVITY_BONUS',
+    'king_shield': 'KING_SAFETY_PENALTY',
+}
+
+# Konstanten in Bauerneinheiten (werden mit piece_values['P'] multipliziert)
+PAWN_UNIT_CONSTANTS = frozenset(PAWN_STRUCTURE_TERMS.values()) | frozenset(PIECE_ACTIVITY_TERMS.values())
+
+# Konstanten, die nicht linear in die Bewertung eingehen und deshalb nicht getunt werden
+UNTUNED_CONSTANTS = frozenset({'CHECKMATE_BONUS'})
+
+
+def pawn_structure_counts(white_pawns: int, black_pawns: int) -> Dict[str, float]:
+    """Zählt die Bauernstruktur-Terme als Differenz Weiß minus Schwarz.
+
+    Strafen werden negativ gezählt, Freibauern nach Fortschritt gewichtet (1/6 bis 1).
+    'central' zählt Bauern auf d4/e4/d5/e5, 'control' die von Bauern angegriffenen
+    Felder des erweiterten Zentrums.
+    """
+    counts = dict.fromkeys(PAWN_STRUCTURE_TERMS, 0.0)
+    for color, own, enemy in ((chess.WHITE, white_pawns, black_pawns), (chess.BLACK, black_pawns, white_pawns)):
+        sign = 1.0 if color == chess.WHITE else -1.0
+        forward = 8 if color == chess.WHITE else -8
+
+        counts['central'] += sign * chess.popcount(own & chess.BB_CENTER)
+        if color == chess.WHITE:
+            attacks = ((own & ~chess.BB_FILE_A) << 7) | ((own & ~chess.BB_FILE_H) << 9)
+        else:
+            attacks = ((own & ~chess.BB_FILE_A) >> 9) | ((own & ~chess.BB_FILE_H) >> 7)
+        counts['control'] += sign * chess.popcount(attacks & EXTENDED_CENTER)
+
+        for file_mask in chess.BB_FILES:
+            on_file = chess.popcount(own & file_mask)
+            if on_file > 1:
+                counts['doubled'] -= sign * (on_file - 1)
+
+        for square in chess.scan_forward(own):
+            file = chess.square_file(square)
+            isolated = not own & ADJACENT_FILES[file]
+            if isolated:
+                counts['isolated'] -= sign
+            elif not own & PAWN_SUPPORT_SPANS[color][square]:
+                # Nicht mehr von eigenen Bauern zu decken und Stoppfeld vom Gegner kontrolliert
+                stop = square + forward
+                if 0 <= stop < 64 and chess.BB_PAWN_ATTACKS[color][stop] & enemy:
+                    counts['backward'] -= sign
+
+            if not enemy & PAWN_FRONT_SPANS[color][square]:
+                relative_rank = chess.square_rank(square) if color == chess.WHITE else 7 - chess.square_rank(square)
+                counts['passed'] += sign * relative_rank / 6.0
+
+            if chess.BB_PAWN_ATTACKS[not color][square] & own:
+                counts['protected'] += sign
+
+    return counts
+
+
+def piece_activity_counts(board: chess.Board, phase: float) -> Dict[str, float]:
+    """Zählt die Aktivitäts-Terme als Differenz Weiß minus Schwarz.
+
+    Entwicklung der Leichtfiguren und fehlende Bauern vor dem König zählen nur im
+    Mittelspiel und werden deshalb mit der Spielphase gewichtet.
+    """
+    counts = dict.fromkeys(PIECE_ACTIVITY_TERMS, 0.0)
+    for color in chess.COLORS:
+        sign = 1.0 if color == chess.WHITE else -1.0
+        own = board.occupied_co[color]
+        own_pawns = board.pawns & own
+        back_rank = chess.BB_RANK_1 if color == chess.WHITE else chess.BB_RANK_8
+
+        counts['central_knights'] += sign * chess.popcount(board.knights & own & chess.BB_CENTER)
+        counts['development'] += sign * phase * chess.popcount((board.knights | board.bishops) & own & ~back_rank)
+
+        for square in chess.scan_forward((board.rooks | board.queens) & own):
+            if not own_pawns & chess.BB_FILES[chess.square_file(square)]:
+                counts['open_files'] += sign
+
+        king = board.king(color)
+        if king is not None:
+            shield_rank = chess.square_rank(king) + (1 if color == chess.WHITE else -1)
+            if 0 <= shield_rank <= 7:
+                shield = chess.BB_KING_ATTACKS[king] & chess.BB_RANKS[shield_rank]
+                counts['king_shield'] -= sign * phase * chess.popcount(shield & ~own_pawns)
+
+    return counts
+
+
+def position_key(board: chess.Board) -> tuple:
+    """Schlüssel einer Stellung für den Bewertungs-Cache.
+
+    Enthält dieselben Informationen wie ein Zobrist-Hash (Figuren, Seite am Zug,
+    Rochaderechte, En-passant-Feld), ist aber ohne Schleife über die Figuren berechenbar.
+    """
+    return (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+            board.occupied_co[chess.WHITE], board.turn, board.castling_rights, board.ep_square)
+
+
+class HashCache:
+    """Direkt adressierte Hash-Tabelle fester Größe mit Trefferstatistik.
+
+    Kollisionen überschreiben den alten Eintrag, der Speicherbedarf ist also durch
+    2**size_bits Einträge begrenzt. Einträge sind (Schlüssel, Wert)-Tupel, damit
+    gleichzeitige Zugriffe aus mehreren Threads nie Schlüssel und Wert vermischen.
+    """
+
+    def __init__(self, size_bits: int):
+        self.mask = (1 << size_bits) - 1
+        self.entries = [None] * (self.mask + 1)
+        self.hits = 0
+        self.lookups = 0
+
+    def get(self, key):
+        self.lookups += 1
+        entry = self.entries[hash(key) & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        return None
+
+    def put(self, key, value):
+        self.entries[hash(key) & self.mask] = (key, value)
+
+    def clear(self):
+        self.entries = [None] * (self.mask + 1)
+        self.hits = 0
+        self.lookups = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {'hits': self.hits, 'lookups': self.lookups, 'hit_rate': self.hit_rate,
+                'size': len(self.entries)}
+
+
 @dataclass
 class PositionalConstants:
     CENTRAL_PAWN_BONUS: float = 0.3
     CENTRAL_KNIGHT_BONUS: float = 0.5
     DOUBLED_PAWN_PENALTY: float = 0.5
     KING_SAFETY_PENALTY: float = 0.3
-    CHECKMATE_BONUS: float = 1000.0
+    CHECKMATE_BONUS: float = 200.0
     FIELD_CONTROL_BONUS: float = 0.1
     MINOR_PIECE_DEVELOPMENT_BONUS: float = 0.1
     MAJOR_PIECE_ACTIVITY_BONUS: float = 0.2
     PAWN_STRUCTURE_BONUS: float = 0.1
+    ISOLATED_PAWN_PENALTY: float = 0.2
+    BACKWARD_PAWN_PENALTY: float = 0.15
+    PASSED_PAWN_BONUS: float = 0.5
 
 class ChessEvaluator:
-    def __init__(self):
+    def __init__(self, config_path: Optional[str] = DEFAULT_CONFIG_PATH,
+                 eval_cache_bits: int = 16, pawn_cache_bits: int = 14):
         # Grundlegende Materialwerte
         self.piece_values = {
             'P': 100,    # Bauer
@@ -42,58 +379,247 @@ class ChessEvaluator:
             chess.KING: 20      # Kleiner Bonus für König
         }
 
-    def evaluate_board(self, board: chess.Board) -> float:
+        self.constants = PositionalConstants()
+
+        # Lazy Evaluation: Abbruch nach Material und Bauernstruktur, wenn selbst der
+        # größtmögliche Piece-Square-Anteil das Fenster nicht mehr erreicht
+        self.lazy_eval = True
+
+        # Bewertungs-Cache (ganze Stellung) und Bauern-Hash (nur Bauernstruktur)
+        self.eval_cache = HashCache(eval_cache_bits)
+        self.pawn_cache = HashCache(pawn_cache_bits)
+
+        if config_path and os.path.exists(config_path):
+            self.load_config(config_path)
+        else:
+            self._build_tables()
+
+    def get_config(self) -> Dict[str, Dict[str, float]]:
+        """Gibt alle einstellbaren Gewichte als verschachteltes Dict zurück."""
+        return {
+            'piece_values': {symbol: self.piece_values[symbol] for symbol in TUNABLE_PIECES},
+            'positional_bonus': {chess.piece_symbol(piece_type).upper(): value
+                                 for piece_type, value in self.positional_bonus.items()},
+            'positional_constants': asdict(self.constants)
+        }
+
+    def set_config(self, config: Dict[str, Dict[str, float]]):
+        """Übernimmt Gewichte aus einem (ggf. unvollständigen) Config-Dict."""
+        for symbol, value in config.get('piece_values', {}).items():
+            symbol = symbol.upper()
+            if symbol not in TUNABLE_PIECES:
+                raise ValueError(f"Unbekannte Figur in piece_values: {symbol}")
+            self.piece_values[symbol] = value
+            self.piece_values[symbol.lower()] = -value
+
+        for symbol, value in config.get('positional_bonus', {}).items():
+            self.positional_bonus[chess.Piece.from_symbol(symbol.upper()).piece_type] = value
+
+        known_constants = {field.name for field in fields(PositionalConstants)}
+        for name, value in config.get('positional_constants', {}).items():
+            if name not in known_constants:
+                raise ValueError(f"Unbekannte Konstante: {name}")
+            setattr(self.constants, name, value)
+
+        self._build_tables()
+        # Gecachte Bewertungen gelten nur für die alten Gewichte
+        self.eval_cache.clear()
+        self.pawn_cache.clear()
+
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        """Trefferquoten von Bewertungs-Cache und Bauern-Hash."""
+        return {'eval_cache': self.eval_cache.stats(), 'pawn_cache': self.pawn_cache.stats()}
+
+    def load_config(self, path: str):
+        """Lädt Gewichte aus einer JSON-Datei."""
+        with open(path, encoding='utf-8') as handle:
+            self.set_config(json.load(handle))
+
+    def save_config(self, path: str):
+        """Speichert die aktuellen Gewichte als JSON-Datei."""
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.get_config(), handle, indent=4)
+
+    def get_weights(self) -> Dict[str, float]:
+        """Flache Sicht auf die tunbaren Gewichte der Config ('gruppe.name' -> Wert)."""
+        return {f"{group}.{name}": value
+                for group, values in self.get_config().items()
+                for name, value in values.items()
+                if not (group == 'positional_constants' and name in UNTUNED_CONSTANTS)}
+
+    def set_weights(self, weights: Dict[str, float]):
+        """Gegenstück zu get_weights."""
+        config = {}
+        for key, value in weights.items():
+            group, name = key.split('.', 1)
+            config.setdefault(group, {})[name] = float(value)
+        self.set_config(config)
+
+    def extract_features(self, board: chess.Board) -> Dict[str, float]:
+        """Zerlegt die Bewertung in lineare Features (aus Sicht von Weiß).
+
+        Für nicht-terminale Stellungen gilt (ohne Lazy-Cutoff)
+        evaluate_board(board) == sum(features[k] * get_weights()[k]).
+        """
+        features = {}
+
+        def add(key, value):
+            features[key] = features.get(key, 0.0) + value
+
+        phase = self.game_phase(board)
+
+        for square, piece in board.piece_map().items():
+            sign = 1.0 if piece.color else -1.0
+            symbol = piece.symbol().upper()
+            if symbol in TUNABLE_PIECES:
+                add(f"piece_values.{symbol}", sign)
+
+            # Analog zu evaluate_position, aber ohne Skalierung mit positional_bonus
+            index = _pst_index(square, piece.color)
+            shape = PST_MG[piece.piece_type][index] * phase + PST_EG[piece.piece_type][index] * (1.0 - phase)
+            add(f"positional_bonus.{symbol}", sign * shape / PST_SCALE)
+
+        # Bauernstruktur in Bauerneinheiten (piece_values.P bleibt beim Tuning fix)
+        counts = pawn_structure_counts(board.pieces_mask(chess.PAWN, chess.WHITE),
+                                       board.pieces_mask(chess.PAWN, chess.BLACK))
+        for term, constant in PAWN_STRUCTURE_TERMS.items():
+            add(f"positional_constants.{constant}", counts[term] * self.piece_values['P'])
+
+        counts = piece_activity_counts(board, phase)
+        for term, constant in PIECE_ACTIVITY_TERMS.items():
+            add(f"positional_constants.{constant}", counts[term] * self.piece_values['P'])
+
+        return {key: value for key, value in features.items() if value != 0.0}
+
+    def _build_tables(self):
+        """Berechnet die Piece-Square-Tables einmalig als flache Arrays je Farbe und Figur.
+
+        Die Einträge enthalten bereits Vorzeichen und Skalierung mit positional_bonus,
+        bei der Bewertung wird also nur noch addiert. pst_max/pst_min enthalten je Farbe und
+        Figurentyp den größten bzw. kleinsten Eintrag (Schranken für die Lazy Evaluation).
+        """
+        self.pst_mg = [[None] * 7 for _ in chess.COLORS]
+        self.pst_eg = [[None] * 7 for _ in chess.COLORS]
+        for color in chess.COLORS:
+            sign = 1.0 if color == chess.WHITE else -1.0
+            for piece_type in chess.PIECE_TYPES:
+                scale = sign * self.positional_bonus[piece_type] / PST_SCALE
+                self.pst_mg[color][piece_type] = [
+                    scale * PST_MG[piece_type][_pst_index(square, color)] for square in chess.SQUARES]
+                self.pst_eg[color][piece_type] = [
+                    scale * PST_EG[piece_type][_pst_index(square, color)] for square in chess.SQUARES]
+
+        # Der interpolierte Beitrag einer Figur liegt immer zwischen den Extremwerten beider Tabellen
+        self.pst_max = [[0.0] * 7 for _ in chess.COLORS]
+        self.pst_min = [[0.0] * 7 for _ in chess.COLORS]
+        for color in chess.COLORS:
+            for piece_type in chess.PIECE_TYPES:
+                entries = self.pst_mg[color][piece_type] + self.pst_eg[color][piece_type]
+                self.pst_max[color][piece_type] = max(entries)
+                self.pst_min[color][piece_type] = min(entries)
+
+    def game_phase(self, board: chess.Board) -> float:
+        """Spielphase aus dem verbleibenden Material: 1.0 = Mittelspiel, 0.0 = Endspiel."""
+        phase = (chess.popcount(board.knights) + chess.popcount(board.bishops) +
+                 2 * chess.popcount(board.rooks) + 4 * chess.popcount(board.queens))
+        return min(phase, MAX_PHASE) / MAX_PHASE
+
+    def evaluate_board(self, board: chess.Board, lower: float = -float('inf'),
+                       upper: float = float('inf')) -> float:
+        """Bewertet die Stellung aus Sicht von Weiß.
+
+        Kann der Piece-Square-Anteil (siehe positional_bounds) Material, Bauernstruktur
+        und Figurenaktivität nicht mehr in [lower, upper] bringen, wird dieser Wert direkt zurückgegeben
+        (Lazy Evaluation). Vollständige Bewertungen werden im eval_cache abgelegt.
+        """
+        key = position_key(board)
+        cached = self.eval_cache.get(key)
+        if cached is not None:
+            return cached
+
         if board.is_checkmate():
-            return -20000 if board.turn else 20000
-            
-        if board.is_stalemate() or board.is_insufficient_material():
-            return 0.0
-            
-        score = self.evaluate_material(board)
-        score += self.evaluate_position(board)
-        
+            mate_score = self.constants.CHECKMATE_BONUS * self.piece_values['P']
+            score = -mate_score if board.turn else mate_score
+        elif board.is_stalemate() or board.is_insufficient_material():
+            score = 0.0
+        else:
+            score = self.evaluate_material(board) + self.evaluate_pawn_structure(board)
+            score += self.evaluate_piece_activity(board)
+            if self.lazy_eval:
+                smallest, largest = self.positional_bounds(board)
+                if score + largest <= lower or score + smallest >= upper:
+                    return score
+
+            score += self.evaluate_position(board)
+
+        self.eval_cache.put(key, score)
         return score
 
     def evaluate_material(self, board: chess.Board) -> float:
         """Bewertet nur das Material auf dem Brett."""
-        return sum(self.piece_values[p.symbol()] for p in board.piece_map().values())
+        score = 0.0
+        for piece_type in chess.PIECE_TYPES:
+            symbol = chess.piece_symbol(piece_type)
+            score += chess.popcount(board.pieces_mask(piece_type, chess.WHITE)) * self.piece_values[symbol.upper()]
+            score += chess.popcount(board.pieces_mask(piece_type, chess.BLACK)) * self.piece_values[symbol]
+        return score
+
+    def positional_bounds(self, board: chess.Board) -> tuple:
+        """Untere und obere Schranke für evaluate_position in dieser Stellung.
+
+        Jede Figur trägt zwischen dem kleinsten und größten Tabelleneintrag ihres Typs bei,
+        egal auf welchem Feld und in welcher Spielphase; das gilt auch nach Umwandlungen.
+        """
+        smallest = largest = 0.0
+        for color in chess.COLORS:
+            pst_min = self.pst_min[color]
+            pst_max = self.pst_max[color]
+            for piece_type in chess.PIECE_TYPES:
+                count = chess.popcount(board.pieces_mask(piece_type, color))
+                smallest += count * pst_min[piece_type]
+                largest += count * pst_max[piece_type]
+        return smallest, largest
 
     def evaluate_position(self, board: chess.Board) -> float:
-        """Bewertet die Position der Figuren."""
-        score = 0.0
-        
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if not piece:
-                continue
-                
-            bonus = 0.0
-            rank = chess.square_rank(square)
-            file = chess.square_file(square)
-            
-            if board.fullmove_number <= 10:  # Eröffnungsphase
-                if piece.piece_type == chess.PAWN:
-                    # Zentrumsbonus für Bauern
-                    if 2 <= file <= 5 and 3 <= rank <= 4:
-                        bonus = self.positional_bonus[chess.PAWN] * 0.5
-                        
-                elif piece.piece_type in [chess.KNIGHT, chess.BISHOP]:
-                    # Entwicklungsbonus
-                    if (piece.color == chess.WHITE and rank > 0) or \
-                       (piece.color == chess.BLACK and rank < 7):
-                        bonus = self.positional_bonus[piece.piece_type] * 0.3
-                        
-                elif piece.piece_type == chess.QUEEN:
-                    # Bestrafung für frühe Damenzüge
-                    if (piece.color == chess.WHITE and square != chess.D1) or \
-                       (piece.color == chess.BLACK and square != chess.D8):
-                        bonus = -self.positional_bonus[chess.QUEEN] * 0.2
-
-            # Addiere/Subtrahiere den Bonus je nach Farbe
-            score += bonus if piece.color else -bonus
-            
+        """Bewertet die Position der Figuren (zwischen Mittel- und Endspiel interpoliert)."""
+        mg_score = 0.0
+        eg_score = 0.0
+
+        for color in chess.COLORS:
+            mg_tables = self.pst_mg[color]
+            eg_tables = self.pst_eg[color]
+            for piece_type in chess.PIECE_TYPES:
+                mg_table = mg_tables[piece_type]
+                eg_table = eg_tables[piece_type]
+                for square in chess.scan_forward(board.pieces_mask(piece_type, color)):
+                    mg_score += mg_table[square]
+                    eg_score += eg_table[square]
+
+        phase = self.game_phase(board)
+        return mg_score * phase + eg_score * (1.0 - phase)
+
+    def evaluate_pawn_structure(self, board: chess.Board) -> float:
+        """Bewertet Bauernstruktur und Zentrumskontrolle der Bauern (über den Bauern-Hash)."""
+        white_pawns = board.pieces_mask(chess.PAWN, chess.WHITE)
+        black_pawns = board.pieces_mask(chess.PAWN, chess.BLACK)
+        key = (white_pawns, black_pawns)
+
+        score = self.pawn_cache.get(key)
+        if score is None:
+            counts = pawn_structure_counts(white_pawns, black_pawns)
+            pawn_unit = self.piece_values['P']
+            score = sum(counts[term] * getattr(self.constants, constant) * pawn_unit
+                        for term, constant in PAWN_STRUCTURE_TERMS.items())
+            self.pawn_cache.put(key, score)
         return score
 
+    def evaluate_piece_activity(self, board: chess.Board) -> float:
+        """Bewertet zentrale Springer, Entwicklung, Türme/Damen auf offenen Linien und Königsschutz."""
+        counts = piece_activity_counts(board, self.game_phase(board))
+        pawn_unit = self.piece_values['P']
+        return sum(counts[term] * getattr(self.constants, constant) * pawn_unit
+                   for term, constant in PIECE_ACTIVITY_TERMS.items())
+
     def evaluate_material_change(self, board: chess.Board, move: chess.Move) -> float:
         """Bewertet Materialänderungen bei einem Zug."""
         if not board.is_capture(move):
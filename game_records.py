@@ -0,0 +1,199 @@
+import json
+import os
+import struct
+
+import chess
+import numpy as np
+
+# Datensatz pro Partie (little endian):
+#   Kopf:   Magic "GR", Ergebnis (uint8), Anzahl Züge (uint32), Länge Start-FEN (uint16),
+#           Länge Einstellungen (uint16)
+#   Daten:  Start-FEN (UTF-8, leer = Grundstellung), Einstellungen (JSON, UTF-8),
+#           Züge (uint16 je Zug), Bedenkzeit je Zug (uint32, Millisekunden)
+# Zug in 16 Bit: Bits 0-5 Startfeld, 6-11 Zielfeld, 12-14 Umwandlungsfigur (0 = keine).
+# Die Indexdatei (<pfad>.idx) enthält je Partie den Offset des Datensatzes als uint64.
+RECORD_MAGIC = b'GR'
+RECORD_HEADER = struct.Struct('<2sBIHH')
+INDEX_ENTRY = struct.Struct('<Q')
+
+RESULT_CODES = {'*': 0, '1-0': 1, '0-1': 2, '1/2-1/2': 3}
+RESULT_NAMES = {code: name for name, code in RESULT_CODES.items()}
+
+try:
+    import fcntl
+
+    def _lock(handle):
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(handle):
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock(handle):
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(handle):
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def pack_move(move: chess.Move) -> int:
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def unpack_move(value: int) -> chess.Move:
+    promotion = (value >> 12) & 0x7
+    return chess.Move(value & 0x3F, (value >> 6) & 0x3F, promotion=promotion or None)
+
+
+class GameRecordWriter:
+    """Hängt Partien an eine Datensatzdatei an.
+
+    Datensatz und Indexeintrag werden unter einer exklusiven Dateisperre geschrieben,
+    mehrere Prozesse können also gleichzeitig in dieselbe Datei schreiben. Bricht ein
+    Schreiber zwischen Datensatz und Index ab, bleibt nur ein unreferenzierter Rest
+    am Dateiende; der Index zeigt immer auf vollständige Datensätze.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + '.idx'
+
+    def append(self, moves, result: str = '*', settings: dict = None, move_times=None,
+               start_fen: str = None) -> int:
+        """Speichert eine Partie und gibt ihre Nummer zurück.
+
+        move_times sind Bedenkzeiten in Sekunden, eine pro Zug.
+        """
+        moves = list(moves)
+        if move_times is not None and len(move_times) != len(moves):
+            raise ValueError("move_times muss genau einen Eintrag pro Zug haben")
+        if result not in RESULT_CODES:
+            raise ValueError(f"Unbekanntes Ergebnis: {result}")
+
+        fen_bytes = (start_fen if start_fen and start_fen != chess.STARTING_FEN else '').encode()
+        settings_bytes = json.dumps(settings or {}).encode()
+        times_ms = [int(round(t * 1000)) for t in move_times] if move_times is not None else [0] * len(moves)
+
+        record = b''.join([
+            RECORD_HEADER.pack(RECORD_MAGIC, RESULT_CODES[result], len(moves), len(fen_bytes), len(settings_bytes)),
+            fen_bytes,
+            settings_bytes,
+            np.array([pack_move(move) for move in moves], dtype='<u2').tobytes(),
+            np.array(times_ms, dtype='<u4').tobytes()
+        ])
+
+        with open(self.path, 'ab') as data, open(self.index_path, 'ab') as index:
+            _lock(data)
+            try:
+                data.seek(0, os.SEEK_END)
+                offset = data.tell()
+                data.write(record)
+                data.flush()
+                index.seek(0, os.SEEK_END)
+                game_number = index.tell() // INDEX_ENTRY.size
+                index.write(INDEX_ENTRY.pack(offset))
+                index.flush()
+            finally:
+                _unlock(data)
+        return game_number
+
+
+class GameRecord:
+    """Eine gelesene Partie; Züge und Zeiten sind Sichten auf die Memory-Map (ohne Kopie)."""
+
+    def __init__(self, result, settings, start_fen, packed_moves, times_ms):
+        self.result = result
+        self.settings = settings
+        self.start_fen = start_fen
+        self.packed_moves = packed_moves
+        self.times_ms = times_ms
+
+    def __len__(self):
+        return len(self.packed_moves)
+
+    @property
+    def moves(self):
+        return [unpack_move(int(value)) for value in self.packed_moves]
+
+    @property
+    def move_times(self):
+        return [ms / 1000.0 for ms in self.times_ms.tolist()]
+
+    def board_at(self, ply: int) -> chess.Board:
+        """Stellung nach ply Halbzügen."""
+        if not 0 <= ply <= len(self):
+            raise IndexError(f"Halbzug {ply} außerhalb der Partie (0-{len(self)})")
+        board = chess.Board(self.start_fen)
+        for value in self.packed_moves[:ply].tolist():
+            board.push(unpack_move(value))
+        return board
+
+
+class GameRecordReader:
+    """Liest Partien per Memory-Map mit wahlfreiem Zugriff über die Indexdatei."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Die Memory-Map bleibt geöffnet, solange noch Sichten (GameRecord) darauf existieren
+        if os.path.getsize(path):
+            self._data = np.memmap(path, dtype=np.uint8, mode='r')
+        else:
+            self._data = np.zeros(0, dtype=np.uint8)  # Leere Dateien lassen sich nicht mappen
+        # Nur vollständige Indexeinträge; später angehängte Partien sieht erst ein neuer Reader
+        self._offsets = np.fromfile(path + '.idx', dtype='<u8',
+                                    count=os.path.getsize(path + '.idx') // INDEX_ENTRY.size)
+
+    def close(self):
+        self._data = np.zeros(0, dtype=np.uint8)
+        self._offsets = np.zeros(0, dtype='<u8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def game(self, number: int) -> GameRecord:
+        """Liest Partie Nummer number, ohne andere Partien anzufassen."""
+        offset = int(self._offsets[number])
+        magic, result, num_moves, fen_length, settings_length = RECORD_HEADER.unpack_from(self._data, offset)
+        if magic != RECORD_MAGIC:
+            raise ValueError(f"Beschädigter Datensatz bei Offset {offset}")
+
+        position = offset + RECORD_HEADER.size
+        start_fen = self._data[position:position + fen_length].tobytes().decode() or chess.STARTING_FEN
+        position += fen_length
+        settings = json.loads(self._data[position:position + settings_length].tobytes().decode())
+        position += settings_length
+        packed_moves = self._data[position:position + 2 * num_moves].view('<u2')
+        position += 2 * num_moves
+        times_ms = self._data[position:position + 4 * num_moves].view('<u4')
+
+        return GameRecord(RESULT_NAMES[result], settings, start_fen, packed_moves, times_ms)
+
+    def board_at(self, number: int, ply: int) -> chess.Board:
+        """Stellung von Partie number nach ply Halbzügen."""
+        return self.game(number).board_at(ply)
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self.game(number)
+
+    def iter_states(self, env, start: int = 0, stop: int = None):
+        """Liefert (Partie, Halbzug, Zustand, Ergebnis) für jede Stellung der Partien start..stop.
+
+        Der Zustand ist die Kodierung von env.get_state(); env.board wird dabei überschrieben.
+        """
+        for number in range(start, len(self) if stop is None else min(stop, len(self))):
+            record = self.game(number)
+            env.board = chess.Board(record.start_fen)
+            yield number, 0, env.get_state(), record.result
+            for ply, value in enumerate(record.packed_moves.tolist(), start=1):
+                env.board.push(unpack_move(value))
+                yield number, ply, env.get_state(), record.result
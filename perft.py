@@ -0,0 +1,145 @@
+import argparse
+import concurrent.futures
+import time
+
+import chess
+
+from evaluate_board import position_key
+
+# Referenzstellungen mit bekannten Knotenzahlen (Tiefe -> Knoten)
+REFERENCE_POSITIONS = {
+    'startpos': (chess.STARTING_FEN,
+                 {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    'kiwipete': ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+                 {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    'position3': ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+                  {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    'position4': ('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+                  {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    'position5': ('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+                  {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+}
+
+
+def perft(board: chess.Board, depth: int, cache: dict = None) -> int:
+    """Zählt alle Blattknoten bis zur angegebenen Tiefe (Make/Unmake auf dem Brett)."""
+    if depth == 0:
+        return 1
+
+    key = None
+    if cache is not None:
+        # Bitboard-Schlüssel statt Zobrist-Hash: zobrist_hash rechnet in Python jedes Mal neu.
+        # Auch Tiefe 1 wird gecacht, die Zuggenerierung ist teurer als der Schlüssel.
+        key = (position_key(board), depth)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if depth == 1:
+        nodes = board.legal_moves.count()
+    else:
+        nodes = 0
+        for move in board.legal_moves:
+            board.push(move)
+            nodes += perft(board, depth - 1, cache)
+            board.pop()
+
+    if key is not None:
+        cache[key] = nodes
+    return nodes
+
+
+def _perft_root_move(fen: str, uci: str, depth: int, use_cache: bool) -> int:
+    """Worker für die parallele Perft: zählt den Teilbaum eines Wurzelzugs."""
+    board = chess.Board(fen)
+    board.push(chess.Move.from_uci(uci))
+    return perft(board, depth - 1, {} if use_cache else None)
+
+
+def divide(board: chess.Board, depth: int, cache: dict = None, workers: int = 1) -> dict:
+    """Gibt die Knotenzahl je Wurzelzug zurück (UCI -> Knoten)."""
+    if depth < 1:
+        raise ValueError("depth muss mindestens 1 sein")
+
+    moves = list(board.legal_moves)
+
+    if workers > 1 and len(moves) > 1:
+        fen = board.fen()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(moves))) as executor:
+            futures = {
+                move.uci(): executor.submit(_perft_root_move, fen, move.uci(), depth, cache is not None)
+                for move in moves
+            }
+            return {uci: future.result() for uci, future in futures.items()}
+
+    result = {}
+    for move in moves:
+        board.push(move)
+        result[move.uci()] = perft(board, depth - 1, cache)
+        board.pop()
+    return result
+
+
+def run_perft(fen: str, depth: int, use_cache: bool = False, workers: int = 1,
+              show_divide: bool = False) -> tuple:
+    """Führt Perft aus, gibt optional die Divide-Ausgabe aus und liefert (Knoten, Sekunden)."""
+    board = chess.Board(fen)
+    cache = {} if use_cache else None
+
+    start_time = time.perf_counter()
+    per_move = divide(board, depth, cache, workers)
+    elapsed = time.perf_counter() - start_time
+    nodes = sum(per_move.values())
+
+    if show_divide:
+        for uci in sorted(per_move):
+            print(f"{uci}: {per_move[uci]}")
+        print()
+
+    return nodes, elapsed
+
+
+def _format_result(nodes: int, elapsed: float) -> str:
+    nps = nodes / elapsed if elapsed > 0 else float('inf')
+    return f"{nodes} Knoten in {elapsed:.3f}s ({nps:,.0f} Knoten/s)"
+
+
+def _positive_depth(value: str) -> int:
+    depth = int(value)
+    if depth < 1:
+        raise argparse.ArgumentTypeError("Tiefe muss mindestens 1 sein")
+    return depth
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft für den Zuggenerator (python-chess Brett).")
+    parser.add_argument('depth', type=_positive_depth, help="Suchtiefe")
+    parser.add_argument('--fen', default=chess.STARTING_FEN, help="Startstellung als FEN")
+    parser.add_argument('--divide', action='store_true', help="Knoten je Wurzelzug ausgeben")
+    parser.add_argument('--suite', action='store_true',
+                        help="Alle Referenzstellungen bis zur angegebenen Tiefe prüfen")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Anzahl Prozesse für die Aufteilung der Wurzelzüge")
+    parser.add_argument('--hash', action='store_true', help="Hash-Tabelle für wiederholte Teilbäume")
+    args = parser.parse_args(argv)
+
+    if not args.suite:
+        nodes, elapsed = run_perft(args.fen, args.depth, args.hash, args.workers, args.divide)
+        print(_format_result(nodes, elapsed))
+        return 0
+
+    failed = 0
+    for name, (fen, expected_counts) in REFERENCE_POSITIONS.items():
+        for depth in sorted(d for d in expected_counts if d <= args.depth):
+            nodes, elapsed = run_perft(fen, depth, args.hash, args.workers, args.divide)
+            expected = expected_counts[depth]
+            status = "OK" if nodes == expected else f"FEHLER (erwartet {expected})"
+            if nodes != expected:
+                failed += 1
+            print(f"{name} Tiefe {depth}: {_format_result(nodes, elapsed)} {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import time
+
+import chess
+import numpy as np
+
+from evaluate_board import ChessEvaluator, DEFAULT_CONFIG_PATH, PAWN_UNIT_CONSTANTS
+
+RESULT_VALUES = {'1-0': 1.0, '0-1': 0.0, '1/2-1/2': 0.5}
+
+
+def parse_labelled_line(line: str):
+    """Liest eine Trainingszeile und gibt (Board, Ergebnis aus Sicht von Weiß) zurück.
+
+    Unterstützt EPD mit Ergebnis-Operation (c9 "1-0"; bzw. result "1-0";)
+    und FEN mit Ergebnis in eckigen Klammern (... [1.0] oder ... [1-0]).
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    if line.endswith(']') and '[' in line:
+        fen, label = line[:-1].rsplit('[', 1)
+        label = label.strip()
+        result = RESULT_VALUES[label] if label in RESULT_VALUES else float(label)
+        return chess.Board(fen.strip()), result
+
+    board, operations = chess.Board.from_epd(line)
+    label = operations.get('c9', operations.get('result'))
+    if label is None:
+        raise ValueError(f"Kein Ergebnis in Zeile: {line}")
+    return board, RESULT_VALUES[str(label)]
+
+
+class FeatureMatrix:
+    """Dünn besetzte Feature-Matrix im Koordinatenformat, als Memory-Map auf der Platte.
+
+    Verzeichnisinhalt: rows/cols/vals (je ein Eintrag pro Nicht-Null-Feature),
+    results (ein Eintrag pro Stellung) und meta.json mit den Feature-Namen.
+    """
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as handle:
+            meta = json.load(handle)
+        self.feature_names = meta['feature_names']
+        self.num_positions = meta['num_positions']
+        self.rows = np.memmap(os.path.join(directory, 'rows.bin'), dtype=np.int32, mode='r')
+        self.cols = np.memmap(os.path.join(directory, 'cols.bin'), dtype=np.int32, mode='r')
+        self.vals = np.memmap(os.path.join(directory, 'vals.bin'), dtype=np.float32, mode='r')
+        self.results = np.memmap(os.path.join(directory, 'results.bin'), dtype=np.float32, mode='r')
+
+    def evaluate(self, weights: np.ndarray) -> np.ndarray:
+        """Bewertet alle Stellungen auf einmal (Centipawns aus Sicht von Weiß)."""
+        return np.bincount(self.rows, weights=self.vals * weights[self.cols], minlength=self.num_positions)
+
+    def gradient(self, per_position: np.ndarray) -> np.ndarray:
+        """Summiert einen Faktor je Stellung über die Features (X^T @ per_position)."""
+        return np.bincount(self.cols, weights=self.vals * per_position[self.rows],
+                           minlength=len(self.feature_names))
+
+
+def extract_features(dataset_path: str, directory: str, evaluator: ChessEvaluator = None,
+                     chunk_size: int = 100000) -> FeatureMatrix:
+    """Extrahiert die Features aller Stellungen einmalig in eine FeatureMatrix.
+
+    Terminale Stellungen (Matt, Patt, Materialmangel) werden übersprungen, da sie
+    nicht linear bewertet werden.
+    """
+    evaluator = evaluator or ChessEvaluator()
+    feature_names = list(evaluator.get_weights())
+    feature_index = {name: index for index, name in enumerate(feature_names)}
+    os.makedirs(directory, exist_ok=True)
+
+    files = {name: open(os.path.join(directory, f'{name}.bin'), 'wb')
+             for name in ('rows', 'cols', 'vals', 'results')}
+    rows, cols, vals, results = [], [], [], []
+    num_positions = 0
+
+    def flush():
+        np.asarray(rows, dtype=np.int32).tofile(files['rows'])
+        np.asarray(cols, dtype=np.int32).tofile(files['cols'])
+        np.asarray(vals, dtype=np.float32).tofile(files['vals'])
+        np.asarray(results, dtype=np.float32).tofile(files['results'])
+        for buffer in (rows, cols, vals, results):
+            buffer.clear()
+
+    try:
+        with open(dataset_path, encoding='utf-8') as handle:
+            for line in handle:
+                parsed = parse_labelled_line(line)
+                if parsed is None:
+                    continue
+                board, result = parsed
+                if board.is_checkmate() or board.is_stalemate() or board.is_insufficient_material():
+                    continue
+
+                for name, value in evaluator.extract_features(board).items():
+                    rows.append(num_positions)
+                    cols.append(feature_index[name])
+                    vals.append(value)
+                results.append(result)
+                num_positions += 1
+
+                if len(results) >= chunk_size:
+                    flush()
+        flush()
+    finally:
+        for handle in files.values():
+            handle.close()
+
+    with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as handle:
+        json.dump({'feature_names': feature_names, 'num_positions': num_positions}, handle)
+
+    return FeatureMatrix(directory)
+
+
+def _sigmoid(scores: np.ndarray, k: float) -> np.ndarray:
+    return 1.0 / (1.0 + np.power(10.0, -k * scores / 400.0))
+
+
+def mean_squared_error(matrix: FeatureMatrix, weights: np.ndarray, k: float) -> float:
+    return float(np.mean((matrix.results - _sigmoid(matrix.evaluate(weights), k)) ** 2))
+
+
+def fit_scaling_constant(matrix: FeatureMatrix, weights: np.ndarray,
+                         low: float = 0.1, high: float = 3.0, iterations: int = 30) -> float:
+    """Bestimmt die Skalierung K der Sigmoidfunktion per Goldener-Schnitt-Suche."""
+    scores = matrix.evaluate(weights)
+    results = np.asarray(matrix.results)
+
+    def error(k):
+        return float(np.mean((results - _sigmoid(scores, k)) ** 2))
+
+    ratio = (np.sqrt(5.0) - 1.0) / 2.0
+    a, b = low, high
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    for _ in range(iterations):
+        if error(c) < error(d):
+            b, d = d, c
+            c = b - ratio * (b - a)
+        else:
+            a, c = c, d
+            d = a + ratio * (b - a)
+    return (a + b) / 2.0
+
+
+def step_scales(feature_names, evaluator: ChessEvaluator) -> np.ndarray:
+    """Schrittweite je Gewicht relativ zur Lernrate (Gewichtseinheiten pro Centipawn).
+
+    Adam bewegt jedes Gewicht um etwa die Lernrate pro Schritt. Die Konstanten für
+    Bauernstruktur und Figurenaktivität sind in Bauerneinheiten angegeben, ihr Schritt
+    wird deshalb durch den Bauernwert geteilt, damit alle Gewichte gleich schnell in
+    Centipawns wandern.
+    """
+    pawn_unit_weights = {f"positional_constants.{constant}" for constant in PAWN_UNIT_CONSTANTS}
+    return np.array([1.0 / evaluator.piece_values['P'] if name in pawn_unit_weights else 1.0
+                     for name in feature_names])
+
+
+def tune(matrix: FeatureMatrix, weights: np.ndarray, k: float, epochs: int = 500,
+         learning_rate: float = 1.0, frozen: np.ndarray = None, step_scale: np.ndarray = None,
+         verbose: bool = True) -> np.ndarray:
+    """Passt alle Gewichte per Adam-Gradientenabstieg auf den Sigmoid-Fehler an.
+
+    learning_rate ist in Centipawns pro Schritt; step_scale (siehe step_scales)
+    rechnet das für Gewichte in anderen Einheiten um.
+    """
+    weights = np.array(weights, dtype=np.float64)
+    results = np.asarray(matrix.results, dtype=np.float64)
+    first_moment = np.zeros_like(weights)
+    second_moment = np.zeros_like(weights)
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+    scale = k * np.log(10.0) / 400.0
+
+    for epoch in range(1, epochs + 1):
+        start_time = time.perf_counter()
+        predicted = _sigmoid(matrix.evaluate(weights), k)
+        error = results - predicted
+        # d/dw mean((r - s)^2) = -2/N * X^T [(r - s) * s * (1 - s) * scale]
+        gradient = -2.0 / len(results) * matrix.gradient(error * predicted * (1.0 - predicted) * scale)
+        if frozen is not None:
+            gradient[frozen] = 0.0
+
+        first_moment = beta1 * first_moment + (1 - beta1) * gradient
+        second_moment = beta2 * second_moment + (1 - beta2) * gradient ** 2
+        corrected_first = first_moment / (1 - beta1 ** epoch)
+        corrected_second = second_moment / (1 - beta2 ** epoch)
+        step = learning_rate * corrected_first / (np.sqrt(corrected_second) + epsilon)
+        weights -= step if step_scale is None else step * step_scale
+
+        if verbose and (epoch == 1 or epoch % 50 == 0 or epoch == epochs):
+            print(f"Epoche {epoch}: Fehler {np.mean(error ** 2):.6f} "
+                  f"({time.perf_counter() - start_time:.3f}s)")
+
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Texel-Tuning der ChessEvaluator-Gewichte.")
+    parser.add_argument('dataset', help="Gelabelte Stellungen (EPD mit c9-Ergebnis oder FEN [Ergebnis])")
+    parser.add_argument('--features', default='features', help="Verzeichnis für die Feature-Matrix")
+    parser.add_argument('--reuse', action='store_true', help="Vorhandene Feature-Matrix wiederverwenden")
+    parser.add_argument('--output', default=DEFAULT_CONFIG_PATH, help="Ziel für die getunte Config")
+    parser.add_argument('--epochs', type=int, default=500)
+    parser.add_argument('--lr', type=float, default=1.0, help="Lernrate (Centipawns pro Schritt)")
+    parser.add_argument('--k', type=float, default=None, help="Sigmoid-Skalierung (Standard: automatisch)")
+    args = parser.parse_args(argv)
+
+    evaluator = ChessEvaluator()
+    if args.reuse and os.path.exists(os.path.join(args.features, 'meta.json')):
+        matrix = FeatureMatrix(args.features)
+    else:
+        matrix = extract_features(args.dataset, args.features, evaluator)
+    print(f"{matrix.num_positions} Stellungen, {len(matrix.vals)} Nicht-Null-Features")
+
+    current = evaluator.get_weights()
+    weights = np.array([current[name] for name in matrix.feature_names], dtype=np.float64)
+    # Der Bauernwert bleibt fix und legt die Centipawn-Skala fest
+    frozen = np.array([name == 'piece_values.P' for name in matrix.feature_names])
+
+    k = args.k if args.k is not None else fit_scaling_constant(matrix, weights)
+    print(f"K = {k:.4f}, Startfehler {mean_squared_error(matrix, weights, k):.6f}")
+
+    weights = tune(matrix, weights, k, args.epochs, args.lr, frozen,
+                   step_scales(matrix.feature_names, evaluator))
+    evaluator.set_weights(dict(zip(matrix.feature_names, weights)))
+    evaluator.save_config(args.output)
+    print(f"Config gespeichert: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())